@@ -12,5 +12,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gallery_site.settings')
+# Under ASGI each request runs its sync code on a fresh thread, so
+# persistent connections would never be reused; close them after
+# every request unless told otherwise. Deployments serving over ASGI
+# must pool with DB_POOL=pgbouncer (see gunicorn.conf.py).
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
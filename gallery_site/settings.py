@@ -13,7 +13,7 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 from pathlib import Path
 import os
 import sys
-import dj_database_url
+from uptowngallery.db import database_settings
 from allauth.account import app_settings
 
 if os.path.isfile("env.py"):
@@ -83,6 +83,8 @@ EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "uptowngallery.profiling.ProfilingMiddleware",
+    "uptowngallery.querywatch.QueryWatchMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -97,7 +99,7 @@ ROOT_URLCONF = "gallery_site.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "uptowngallery.profiling.ProfiledDjangoTemplates",
         "DIRS": [TEMPLATES_DIR],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -117,12 +119,131 @@ WSGI_APPLICATION = "gallery_site.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
-DATABASES = {
-    "default": dj_database_url.parse(os.environ.get("DATABASE_URL"))
+# Connections are kept for DB_CONN_MAX_AGE seconds and health-checked;
+# set DB_POOL=pgbouncer to go through PgBouncer instead
+# (see uptowngallery.db.database_settings).
+
+DATABASES = {"default": database_settings()}
+
+if "test" in sys.argv:
+    DATABASES["default"]["ENGINE"] = "uptowngallery.db_backends.sqlite3"
+
+# Cache
+# CACHE_BACKEND selects "locmem" (default), "file", "redis" or "db";
+# CACHE_LOCATION is the directory, redis:// URL or table name for the
+# last three ("db" needs `python manage.py createcachetable`).
+# The closer and ingest processes invalidate cached pages, so they
+# refuse to loop unless the cache is shared with the web process.
+
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "db": "django.core.cache.backends.db.DatabaseCache",
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[os.environ.get("CACHE_BACKEND", "locmem")],
+        "LOCATION": os.environ.get("CACHE_LOCATION", "uptowngallery"),
+    }
+}
+
+# Live bid events
+# EVENT_BROKER selects "memory" (default; one process only) or "redis",
+# with EVENT_BROKER_URL. Any setup with more than one web process (gunicorn
+# workers or dynos) needs "redis"; gunicorn.conf.py runs a single worker
+# with the in-memory broker. Closed events from the closer process only
+# travel through "redis"; otherwise streams notice the closed auction
+# at their next heartbeat.
+
+EVENT_BROKERS = {
+    "memory": "uptowngallery.events.InProcessBroker",
+    "redis": "uptowngallery.events.RedisBroker",
+}
+
+EVENT_BROKER = EVENT_BROKERS[os.environ.get("EVENT_BROKER", "memory")]
+EVENT_BROKER_URL = os.environ.get("EVENT_BROKER_URL")
+
+# Server-Sent Event streams send a keep-alive comment every
+# EVENT_STREAM_HEARTBEAT seconds and end after EVENT_STREAM_MAX_SECONDS;
+# browsers reconnect on their own.
+
+EVENT_STREAM_HEARTBEAT = 15
+EVENT_STREAM_MAX_SECONDS = 300
+
+# Image ingestion
+# Artwork images are staged in the database by the web process and
+# uploaded by the ingest_images worker, which may run on another dyno.
+# IMAGE_UPLOAD_BACKEND selects "cloudinary" (default) or "local",
+# a stand-in that keeps images in IMAGE_LOCAL_ROOT for offline work.
+
+IMAGE_UPLOAD_BACKENDS = {
+    "cloudinary": "uptowngallery.ingestion.CloudinaryBackend",
+    "local": "uptowngallery.ingestion.LocalBackend",
 }
 
+IMAGE_UPLOAD_BACKEND = IMAGE_UPLOAD_BACKENDS[
+    os.environ.get("IMAGE_UPLOAD_BACKEND", "cloudinary")
+]
+IMAGE_LOCAL_ROOT = os.environ.get(
+    "IMAGE_LOCAL_ROOT", os.path.join(BASE_DIR, "local_images")
+)
+IMAGE_LOCAL_URL = "/local-images/"
+
+# Listing cards, thumbnails and detail images are served as resized
+# renditions (see uptowngallery.renditions), built by IMAGE_RENDERER:
+# Cloudinary URL transformations, or Pillow with the local backend.
+
+IMAGE_RENDERERS = {
+    "cloudinary": "uptowngallery.renditions.CloudinaryRenderer",
+    "local": "uptowngallery.renditions.LocalRenderer",
+}
+
+IMAGE_RENDERER = IMAGE_RENDERERS[
+    os.environ.get("IMAGE_UPLOAD_BACKEND", "cloudinary")
+]
+
+# Request profiling
+# A PROFILING_SAMPLE_RATE share of requests (0 to 1) is profiled:
+# query, template, Cloudinary and SMTP timings are logged as JSON and,
+# with PROFILING_SERVER_TIMING, sent back in a Server-Timing header.
+
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", 0))
+PROFILING_SERVER_TIMING = (
+    os.environ.get("PROFILING_SERVER_TIMING", "True") == "True"
+)
+
+# Query watch (development and staging)
+# With QUERY_WATCH=True, queries slower than SLOW_QUERY_SECONDS are
+# logged, and so are query shapes a request repeats
+# NPLUSONE_THRESHOLD times or more (N+1 lookups). The test suite
+# turns it on with NPLUSONE_RAISE, so new N+1s fail the tests.
+
+QUERY_WATCH = os.environ.get("QUERY_WATCH", "False") == "True"
+SLOW_QUERY_SECONDS = float(os.environ.get("SLOW_QUERY_SECONDS", 0.5))
+NPLUSONE_THRESHOLD = int(os.environ.get("NPLUSONE_THRESHOLD", 5))
+NPLUSONE_RAISE = os.environ.get("NPLUSONE_RAISE", "False") == "True"
+
 if "test" in sys.argv:
-    DATABASES["default"]["ENGINE"] = "django.db.backends.sqlite3"
+    QUERY_WATCH = NPLUSONE_RAISE = True
+
+# Metrics
+# /metrics serves Prometheus text. Gunicorn workers add up their
+# counts through files in METRICS_DIR (unset: per process only).
+# Scrapers must send METRICS_TOKEN as a bearer token; without it
+# /metrics and /cache-stats/ answer 403 unless DEBUG is on.
+
+METRICS_DIR = os.environ.get("METRICS_DIR")
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+# Performance budgets
+# The budget tests write their measurements here as JSON
+# so query counts and render times can be trended across commits.
+
+PERF_BUDGET_REPORT = os.environ.get(
+    "PERF_BUDGET_REPORT", os.path.join(BASE_DIR, "perf_budget_report.json")
+)
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
+from django.conf.urls.static import static
 
 
 urlpatterns = [
@@ -9,5 +10,10 @@ urlpatterns = [
     path("accounts/", include("allauth.urls")),
 ]
 
+# Images kept by the local image backend (served in DEBUG only).
+urlpatterns += static(
+    settings.IMAGE_LOCAL_URL, document_root=settings.IMAGE_LOCAL_ROOT
+)
+
 handler404 = "uptowngallery.views.handler404"
 handler500 = "uptowngallery.views.handler500"
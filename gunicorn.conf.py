@@ -0,0 +1,99 @@
+"""
+Gunicorn settings for the web process.
+
+GUNICORN_PROFILE selects how requests are served:
+- "uvicorn" (default): uvicorn workers running gallery_site.asgi.
+  Needed for the live bid streams, which hold a connection open
+  without tying up a worker. Requires PgBouncer (DB_POOL=pgbouncer):
+  under ASGI database connections are closed after every request,
+  so without a pool each request opens a new one. The server logs
+  a warning when DB_POOL is not set.
+- "gthread": sync Django over WSGI with GUNICORN_THREADS threads
+  per worker, so a slow Cloudinary or SMTP call blocks one thread
+  instead of the whole worker. Live bid streams are not suitable
+  here: each stream holds a thread until EVENT_STREAM_MAX_SECONDS.
+- "sync": one request at a time per worker, gunicorn's default.
+
+WEB_CONCURRENCY sets the number of worker processes (Heroku sets it
+from the dyno size). `python manage.py loadtest` compares the profiles.
+With the default in-memory EVENT_BROKER, live bid events only reach
+streams held by the worker that published them, so the server runs
+one worker whatever WEB_CONCURRENCY says, and logs a warning when it
+asked for more; set EVENT_BROKER=redis (and EVENT_BROKER_URL) to run
+several.
+
+Workers share their /metrics counts through files in METRICS_DIR,
+which is emptied when the server starts. The file of an exited
+worker is folded into one file for all exited workers.
+"""
+
+import glob
+import logging
+import os
+
+logger = logging.getLogger("gunicorn.error")
+
+PROFILES = {
+    "sync": {
+        "wsgi_app": "gallery_site.wsgi:application",
+        "worker_class": "sync",
+        "threads": 1,
+    },
+    "gthread": {
+        "wsgi_app": "gallery_site.wsgi:application",
+        "worker_class": "gthread",
+        "threads": int(os.environ.get("GUNICORN_THREADS", 4)),
+    },
+    "uvicorn": {
+        "wsgi_app": "gallery_site.asgi:application",
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "threads": 1,
+    },
+}
+
+profile_name = os.environ.get("GUNICORN_PROFILE", "uvicorn")
+profile = PROFILES[profile_name]
+if profile_name == "uvicorn" and os.environ.get("DB_POOL") != "pgbouncer":
+    logger.warning(
+        "The uvicorn profile opens a database connection per request "
+        "without PgBouncer: set DB_POOL=pgbouncer, or "
+        "GUNICORN_PROFILE=gthread to keep persistent connections."
+    )
+
+wsgi_app = profile["wsgi_app"]
+worker_class = profile["worker_class"]
+threads = profile["threads"]
+shared_events = os.environ.get("EVENT_BROKER", "memory") != "memory"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2 if shared_events else 1))
+if workers > 1 and not shared_events:
+    logger.warning(
+        f"Running 1 worker instead of WEB_CONCURRENCY={workers}: the "
+        "in-memory event broker only delivers live bid events within one "
+        "worker. Set EVENT_BROKER=redis to run more."
+    )
+    workers = 1
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then, staggered, to bound memory growth.
+max_requests = 1000
+max_requests_jitter = 100
+accesslog = "-"
+
+os.environ.setdefault("METRICS_DIR", "/tmp/uptowngallery-metrics")
+
+
+def on_starting(server):
+    for path in glob.glob(os.path.join(os.environ["METRICS_DIR"], "*.json")):
+        os.remove(path)
+
+
+def child_exit(server, worker):
+    from uptowngallery.metrics import fold_exited_worker
+
+    try:
+        fold_exited_worker(os.environ["METRICS_DIR"], worker.pid)
+    except OSError as e:
+        server.log.error(f"Error folding metrics of worker {worker.pid}: {e}")
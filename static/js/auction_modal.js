@@ -1,19 +1,49 @@
-/* Initializes a modal popup for auction details. When the modal is triggered, it performs an AJAX request 
-to fetch and display details about a specific auction. The auction's ID and artwork's ID are extracted from
-the button that triggered the modal. It then updates the modal content with the fetched data and sets
-the modal title. In case of an AJAX error, it displays an error message within the modal.*/
+/* Initializes a modal popup for auction details. When the modal is triggered, it fetches the auction's
+state as JSON from /api/auctions/<id>/state (the browser revalidates it with its ETag, so re-opening an
+unchanged auction costs an empty 304 response) and renders the card from it. The auction's ID is
+extracted from the button that triggered the modal. Once rendered, the card subscribes to live bid
+updates until the modal is hidden. In case of an AJAX error, it displays an error message within the
+modal.*/
+function renderAuctionCard(state) {
+  let artwork = state.artwork;
+  let card = $('<div class="card bg-dark text-light border-info mb-5"></div>');
+  if (artwork.image) {
+    card.append(
+      $('<div class="row no-gutters"><div class="col-12 d-flex justify-content-center mt-3"></div></div>')
+        .find('div.col-12')
+        .append($('<img class="card-img ajax mb-3" aria-label="Artwork Image">').attr({ src: artwork.image, alt: artwork.title }))
+        .end()
+    );
+  }
+  let details = $('<p class="card-text text-center"></p>').attr('data-bid-stream', state.events_url);
+  details.append('<strong>Category:</strong> ', $('<span>').text(artwork.category), '<br/>');
+  details.append('<strong>Artist:</strong> ', $('<span>').text(artwork.artist || ''), '<br/>');
+  details.append('<strong>Number of Bids:</strong> ', $('<span class="js-bid-count">').text(state.bid_count), '<br/>');
+  details.append('<strong>Current Price:</strong> ', $('<span class="js-current-price">').text(parseFloat(state.current_price).toFixed(2)), '<br/>');
+  details.append($('<span class="js-auction-closed">This auction has closed.</span>').toggleClass('d-none', state.status === 'active'));
+  let body = $('<div class="card-body"></div>')
+    .append($('<h2 class="card-title text-center mt-3 mb-3"></h2>').text(artwork.title))
+    .append(details)
+    .append(
+      $('<div class="text-center mt-3 mb-3"></div>').append(
+        $('<a class="btn btn-info" aria-label="Link to auction detail page">View Auction</a>').attr('href', state.detail_url)
+      )
+    );
+  return card.append(body);
+}
+
 $(function () {
   $('#auctionModal').on('show.bs.modal', function (event) {
     let button = $(event.relatedTarget);
-    let artworkId = button.data('artwork-id');
     let auctionId = button.data('auction-id');
     $.ajax({
-      url: '/auction_detail/' + artworkId + '/' + auctionId + '/',
+      url: '/api/auctions/' + auctionId + '/state',
       type: 'GET',
-      success: function (data) {
-        $('#auction-detail-content').html(data);
-        let title = $('#auction-detail-content').find('h1').first().text();
-        $('#auctionModalLabel').text(title);
+      dataType: 'json',
+      success: function (state) {
+        $('#auction-detail-content').empty().append(renderAuctionCard(state));
+        $('#auctionModalLabel').text(state.artwork.title);
+        watchBids('#auction-detail-content');
       },
       error: function (jqXHR, textStatus, errorThrown) {
         console.error('AJAX error:', textStatus, errorThrown);
@@ -21,4 +51,7 @@ $(function () {
       }
     });
   });
-});
\ No newline at end of file
+  $('#auctionModal').on('hidden.bs.modal', function () {
+    stopWatchingBids('#auction-detail-content');
+  });
+});
@@ -0,0 +1,44 @@
+/* Keeps the price and bid count of an auction up to date while it is on screen. Any element with a
+data-bid-stream attribute (the URL of the auction's event stream) is subscribed with EventSource; each
+state or bid event rewrites its .js-current-price and .js-bid-count children, and the stream is closed
+when the auction is not or no longer active, or the element is removed. */
+function watchBids(container) {
+  $(container).find('[data-bid-stream]').addBack('[data-bid-stream]').each(function () {
+    let element = $(this);
+    if (element.data('bidSource')) {
+      return;
+    }
+    let source = new EventSource(element.data('bid-stream'));
+    let update = function (event) {
+      let data = JSON.parse(event.data);
+      element.find('.js-current-price').text(parseFloat(data.current_price).toFixed(2));
+      element.find('.js-bid-count').text(data.bid_count);
+      return data;
+    };
+    source.addEventListener('state', function (event) {
+      if (update(event).status !== 'active') {
+        source.close();
+      }
+    });
+    source.addEventListener('bid', update);
+    source.addEventListener('closed', function () {
+      element.find('.js-auction-closed').removeClass('d-none');
+      source.close();
+    });
+    element.data('bidSource', source);
+  });
+}
+
+function stopWatchingBids(container) {
+  $(container).find('[data-bid-stream]').addBack('[data-bid-stream]').each(function () {
+    let source = $(this).data('bidSource');
+    if (source) {
+      source.close();
+      $(this).removeData('bidSource');
+    }
+  });
+}
+
+$(function () {
+  watchBids(document.body);
+});
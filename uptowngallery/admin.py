@@ -1,9 +1,9 @@
-from django.db import transaction
-from django.utils import timezone
 from django.contrib import admin
 from .forms import ArtworkCreateForm
 from .models import Artwork, Auction
-from .signals import artwork_approved, artwork_denied
+from .approvals import approve_artworks, deny_artworks
+from .deletion import delete_artworks, delete_auctions
+from .metrics import ADMIN_ACTIONS
 
 
 class ArtworkAdmin(admin.ModelAdmin):
@@ -32,21 +32,19 @@ class ArtworkAdmin(admin.ModelAdmin):
         )
 
     def approve_artworks(self, request, queryset):
-        queryset.update(approved=True, auction_start=timezone.now())
-        for artwork in queryset:
-            artwork_approved.send(
-                sender=self.__class__, artwork=artwork, request=request
-            )
+        approved = approve_artworks(queryset)
+        ADMIN_ACTIONS.labels("approve_artworks").inc(approved)
+        self.message_user(
+            request, f"Approved {approved} artworks and started their auctions."
+        )
 
     approve_artworks.short_description = "Approve selected artworks"
     exclude = ["approved", "auction_start"]
 
     def deny_artworks(self, request, queryset):
-        queryset.update(approved=False)
-        for artwork in queryset:
-            artwork_denied.send(
-                sender=self.__class__, artwork=artwork, request=request
-            )
+        denied = deny_artworks(queryset)
+        ADMIN_ACTIONS.labels("deny_artworks").inc(denied)
+        self.message_user(request, f"Denied {denied} artworks.")
 
     deny_artworks.short_description = "Deny selected artworks"
 
@@ -55,20 +53,19 @@ class ArtworkAdmin(admin.ModelAdmin):
         This method is called when admin
         tries to delete artworks in bulk
         from the admin interface.
+        Artworks, auctions and bids are removed
+        in chunks with set-based deletes.
         """
-        with transaction.atomic():
-            for artwork in queryset:
-                Auction.objects.filter(artwork=artwork).delete()
-                artwork.delete()
+        result = delete_artworks(queryset)
+        ADMIN_ACTIONS.labels("delete_artworks").inc(result.artworks)
 
     def delete_model(self, request, obj):
         """
         This method is called when an admin
         tries to delete a single artwork instance.
         """
-        with transaction.atomic():
-            Auction.objects.filter(artwork=obj).delete()
-            obj.delete()
+        result = delete_artworks([obj.pk])
+        ADMIN_ACTIONS.labels("delete_artworks").inc(result.artworks)
 
 
 admin.site.register(Artwork, ArtworkAdmin)
@@ -77,4 +74,12 @@ class AuctionAdmin(admin.ModelAdmin):
     list_display = ("id", "artwork", "status", "end_date")  
     list_editable = ("status",)  
 
+    def delete_queryset(self, request, queryset):
+        """
+        Delete the selected auctions and their bids
+        in chunks with set-based deletes.
+        """
+        result = delete_auctions(queryset)
+        ADMIN_ACTIONS.labels("delete_auctions").inc(result.auctions)
+
 admin.site.register(Auction, AuctionAdmin)
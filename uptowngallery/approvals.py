@@ -0,0 +1,118 @@
+import logging
+from django.db import transaction
+from django.utils import timezone
+from .cache import invalidate_auction_state, invalidate_catalogue
+from .catalog import refresh_catalog
+from .models import Artwork, Auction
+from .signals import artworks_approved, artworks_denied
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+AUCTION_FIELDS = [
+    "create_date",
+    "end_date",
+    "reserve_price",
+    "status",
+    "is_active",
+    "duration",
+    "updated_at",
+]
+
+
+def approve_artworks(queryset, now=None):
+    """
+    Approve a set of artworks and start their auctions in one
+    transaction. This does the same as approve_and_start_auction,
+    but in bulk:
+    - one UPDATE for the artworks;
+    - bulk_update for the auctions that already exist;
+    - bulk_create for the ones that don't;
+    - one refresh of their catalogue rows;
+    - a single artworks_approved signal once the transaction commits,
+      which queues every notification email in one INSERT.
+    Returns the number of artworks approved.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        artworks = list(queryset.select_related("artist__user"))
+        if not artworks:
+            return 0
+        ids = [artwork.pk for artwork in artworks]
+        Artwork.objects.filter(pk__in=ids).update(
+            approved=True,
+            approval_status="approved",
+            auction_start=now,
+            updated_at=now,
+        )
+        latest = {}
+        for auction in Auction.objects.filter(artwork_id__in=ids).order_by(
+            "id"
+        ):
+            latest[auction.artwork_id] = auction
+        to_update, to_create = [], []
+        for artwork in artworks:
+            artwork.approved = True
+            artwork.approval_status = "approved"
+            artwork.auction_start = now
+            auction = latest.get(artwork.pk) or Auction(artwork=artwork)
+            auction.create_date = now
+            auction.end_date = artwork.calculate_auction_end_date(now)
+            auction.reserve_price = artwork.reserve_price
+            auction.status = "active"
+            auction.is_active = True
+            auction.duration = artwork.auction_duration
+            auction.updated_at = now
+            (to_update if auction.pk else to_create).append(auction)
+        Auction.objects.bulk_update(
+            to_update, AUCTION_FIELDS, batch_size=BATCH_SIZE
+        )
+        Auction.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+        refresh_catalog(ids)
+        _after_commit(artworks_approved, artworks, to_update)
+    return len(artworks)
+
+
+def deny_artworks(queryset, now=None):
+    """
+    Reject a set of artworks and cancel any auctions still running
+    for them, with one UPDATE each, drop their catalogue rows,
+    then send a single artworks_denied signal once the
+    transaction commits.
+    Returns the number of artworks denied.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        artworks = list(queryset.select_related("artist__user"))
+        if not artworks:
+            return 0
+        ids = [artwork.pk for artwork in artworks]
+        Artwork.objects.filter(pk__in=ids).update(
+            approved=False, approval_status="rejected", updated_at=now
+        )
+        cancelled = list(
+            Auction.objects.filter(artwork_id__in=ids, status="active")
+        )
+        Auction.objects.filter(pk__in=[a.pk for a in cancelled]).update(
+            status="cancelled", is_active=False, updated_at=now
+        )
+        refresh_catalog(ids)
+        for artwork in artworks:
+            artwork.approved = False
+            artwork.approval_status = "rejected"
+        _after_commit(artworks_denied, artworks, cancelled)
+    return len(artworks)
+
+
+def _after_commit(signal, artworks, changed_auctions):
+    def notify():
+        invalidate_catalogue(*{artwork.category for artwork in artworks})
+        invalidate_auction_state(*[auction.pk for auction in changed_auctions])
+        responses = signal.send_robust(sender=Artwork, artworks=artworks)
+        for receiver, response in responses:
+            if isinstance(response, Exception):
+                logger.error(
+                    f"Error in receiver {receiver.__name__}: {response}"
+                )
+
+    transaction.on_commit(notify)
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import logging
+from django.db import connection, transaction
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.urls import reverse
+from django.utils import timezone
+from .cache import (
+    cached_auction_state,
+    invalidate_auction_state,
+    invalidate_catalogue,
+)
+from .catalog import refresh_prices, remove_auctions
+from .models import Auction, Bids
+from .renditions import rendition_set
+from .signals import auctions_closed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def close_expired_auctions(batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """
+    Close every active auction whose end date has passed,
+    one batch at a time, and return the number of auctions closed.
+    Can be run from the close_auctions management command
+    or scheduled as a django-q task
+    ("uptowngallery.auctions.close_expired_auctions").
+    Either way it runs outside the web process, so the cache must
+    be shared for its invalidations to reach the listing pages
+    (see is_shared_cache).
+    """
+    now = now or timezone.now()
+    total = 0
+    while True:
+        closed_ids = close_expired_batch(batch_size, now)
+        total += len(closed_ids)
+        if len(closed_ids) < batch_size:
+            return total
+
+
+def close_expired_batch(batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """
+    Close up to `batch_size` expired auctions with a single
+    UPDATE ... RETURNING statement that also copies the current
+    high bid into winning_bid, and drop them from the catalogue
+    in the same transaction. Once the transaction commits the
+    listing cache is invalidated and a single auctions_closed
+    signal is sent for the batch.
+    Returns the ids of the auctions that were closed.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        closed_ids = _close_rows(batch_size, now)
+        if closed_ids:
+            remove_auctions(closed_ids)
+            transaction.on_commit(
+                lambda: _after_close(closed_ids)
+            )
+    if closed_ids:
+        logger.info(f"Closed {len(closed_ids)} expired auctions")
+    return closed_ids
+
+
+def _expired_auctions(now):
+    return Auction.objects.filter(
+        status="active", end_date__lte=now
+    ).order_by("end_date")
+
+
+def _close_rows(batch_size, now):
+    """
+    Run the bulk close. Uses the (status, end_date) indexes to find
+    expired rows and, where supported, SKIP LOCKED so several closers
+    can work side by side.
+    """
+    expired = _expired_auctions(now)
+    if connection.features.has_select_for_update_skip_locked:
+        expired = expired.select_for_update(skip_locked=True)
+    if not _can_update_returning():
+        # No UPDATE ... RETURNING on this backend (e.g. MySQL):
+        # read the batch first, then close it with one UPDATE.
+        ids = list(expired.values_list("id", flat=True)[:batch_size])
+        Auction.objects.filter(id__in=ids, status="active").update(
+            status="closed",
+            is_active=False,
+            closed_at=now,
+            updated_at=now,
+            winning_bid=F("high_bid"),
+        )
+        return ids
+
+    subquery, params = expired.values("id")[:batch_size].query.sql_with_params()
+    table = connection.ops.quote_name(Auction._meta.db_table)
+    sql = (
+        f"UPDATE {table} "
+        "SET status = %s, is_active = %s, closed_at = %s, updated_at = %s, "
+        "winning_bid_id = high_bid_id "
+        f"WHERE id IN ({subquery}) AND status = %s "
+        "RETURNING id"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql,
+            [
+                "closed",
+                False,
+                connection.ops.adapt_datetimefield_value(now),
+                connection.ops.adapt_datetimefield_value(now),
+                *params,
+                "active",
+            ],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _can_update_returning():
+    """
+    Whether the database runs UPDATE ... RETURNING: PostgreSQL,
+    and SQLite from 3.35. MySQL and MariaDB have no RETURNING on
+    UPDATE and Oracle only has RETURNING INTO, so they take the
+    read-then-update path.
+    """
+    if connection.vendor == "postgresql":
+        return True
+    if connection.vendor == "sqlite":
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return False
+
+
+def _after_close(closed_ids):
+    closed = list(
+        Auction.objects.filter(id__in=closed_ids).select_related(
+            "artwork__artist__user", "winning_bid__bidder__user"
+        )
+    )
+    invalidate_catalogue(
+        *{auction.artwork.category for auction in closed if auction.artwork}
+    )
+    invalidate_auction_state(*closed_ids)
+    responses = auctions_closed.send_robust(sender=Auction, auctions=closed)
+    for receiver, response in responses:
+        if isinstance(response, Exception):
+            logger.error(f"Error in receiver {receiver.__name__}: {response}")
+
+
+def refresh_auction_stats(auctions):
+    """
+    Recompute the denormalized bid columns for a queryset of auctions
+    with correlated subqueries, and copy the new prices to their
+    catalogue rows. Returns the number of auctions updated.
+    """
+    bids = Bids.objects.filter(auction=OuterRef("pk"))
+    top_bid = bids.order_by("-amount", "bid_time", "id")
+    totals = (
+        bids.order_by()
+        .values("auction")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    latest = (
+        bids.order_by()
+        .values("auction")
+        .annotate(latest=Max("bid_time"))
+        .values("latest")
+    )
+    updated = auctions.update(
+        updated_at=timezone.now(),
+        current_price=Subquery(top_bid.values("amount")[:1]),
+        high_bid=Subquery(top_bid.values("id")[:1]),
+        bid_count=Coalesce(
+            Subquery(totals, output_field=IntegerField()), 0
+        ),
+        last_bid_at=Subquery(latest),
+    )
+    refresh_prices(auctions)
+    return updated
+
+
+def auction_state(auction_id):
+    """
+    Return the public state of an auction as a JSON-ready dict,
+    including a `version` that changes whenever any of it does
+    (used as the ETag of the state endpoint), or None if the
+    auction does not exist. Built with a single query and cached
+    briefly (see cached_auction_state).
+    """
+    return cached_auction_state(
+        auction_id, lambda: _build_auction_state(auction_id)
+    )
+
+
+def _build_auction_state(auction_id):
+    auction = (
+        Auction.objects.filter(pk=auction_id)
+        .select_related("artwork__artist")
+        .first()
+    )
+    if auction is None or auction.artwork is None:
+        return None
+    artwork = auction.artwork
+    state = {
+        "id": auction.pk,
+        "status": auction.status,
+        "current_price": str(auction.price),
+        "bid_count": auction.bid_count,
+        "end_date": auction.end_date.isoformat() if auction.end_date else None,
+        "artwork": {
+            "id": artwork.pk,
+            "title": artwork.title,
+            "artist": artwork.artist.name if artwork.artist else None,
+            "category": artwork.get_category_display(),
+            "image": (rendition_set(artwork, "detail") or {}).get("src"),
+        },
+        "detail_url": reverse(
+            "auction_detail",
+            kwargs={"artwork_id": artwork.pk, "auction_id": auction.pk},
+        ),
+        "events_url": reverse(
+            "auction_events", kwargs={"auction_id": auction.pk}
+        ),
+    }
+    encoded = json.dumps(state, sort_keys=True).encode()
+    state["version"] = hashlib.md5(encoded).hexdigest()[:16]
+    return state
@@ -0,0 +1,174 @@
+import logging
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional
+from django.db import OperationalError, connection, transaction
+from django.utils import timezone
+from .cache import invalidate_auction_state, invalidate_catalogue
+from .models import Auction, Bids
+from .signals import bid_placed
+
+logger = logging.getLogger(__name__)
+
+CLOSED_STATUSES = ("closed", "cancelled")
+CAS_MAX_ATTEMPTS = 50
+
+
+@dataclass
+class BidResult:
+    """
+    Outcome of a bid placement attempt.
+    `accepted` tells whether the bid was stored,
+    `bid` holds the saved bid when it was,
+    `current_price` is the auction price after the attempt
+    and `error` explains a rejection.
+    """
+
+    accepted: bool
+    current_price: Optional[Decimal] = None
+    bid: Optional[Bids] = None
+    error: str = ""
+
+
+class StaleBidError(Exception):
+    """
+    Raised inside the compare-and-swap path when another
+    bid changed the auction between our read and our write.
+    """
+
+
+def place_bid(auction_id, bidder, amount, user=None):
+    """
+    Place a bid of `amount` on an auction for `bidder` (a UserProfile).
+    On databases with row locks the auction row is locked with
+    SELECT ... FOR UPDATE, validated and written in one transaction.
+    Elsewhere (SQLite) the bid is written optimistically and the
+    auction is only updated if its bid count is unchanged,
+    retrying on conflicts.
+    Once an accepted bid commits, the listing cache of the artwork's
+    category and the auction's cached state are dropped.
+    Returns a BidResult; never raises for a rejected bid.
+    """
+    amount = Decimal(amount)
+    if connection.features.has_select_for_update:
+        result = _place_locked(auction_id, bidder, amount)
+    else:
+        result = _place_optimistic(auction_id, bidder, amount)
+    if result.accepted:
+        bid = result.bid
+        category = bid.auction.artwork.category
+        transaction.on_commit(
+            lambda: _invalidate_after_bid(category, auction_id)
+        )
+        transaction.on_commit(
+            lambda: _notify_bid_placed(bid, user or bidder.user)
+        )
+    return result
+
+
+def _invalidate_after_bid(category, auction_id):
+    invalidate_catalogue(category)
+    invalidate_auction_state(auction_id)
+
+
+def _notify_bid_placed(bid, user):
+    """
+    Send bid_placed for a committed bid. Receiver errors are logged
+    rather than raised: the bid is already stored.
+    """
+    responses = bid_placed.send_robust(sender=Bids, bid=bid, user=user)
+    for receiver, response in responses:
+        if isinstance(response, Exception):
+            logger.error(
+                f"Error in bid_placed receiver {receiver.__name__}: {response}"
+            )
+
+
+def check_bid(auction, amount, now=None):
+    """
+    Validate a bid amount against an auction row.
+    Returns an error message, or an empty string if the bid is acceptable.
+    """
+    now = now or timezone.now()
+    if amount <= 0:
+        return "Bid amount must be positive."
+    if auction.status in CLOSED_STATUSES or (
+        auction.end_date and auction.end_date <= now
+    ):
+        return "This auction is no longer accepting bids."
+    if auction.reserve_price is not None and amount < auction.reserve_price:
+        return "Bid amount cannot be lower than the reserve price."
+    if auction.current_price is not None and amount <= auction.current_price:
+        return "Your bid is not higher than the current highest bid."
+    return ""
+
+
+def _place_locked(auction_id, bidder, amount):
+    # The artwork is only read for its category; lock just the auction
+    # row where the backend can say so.
+    auctions = (
+        Auction.objects.select_for_update(of=("self",))
+        if connection.features.has_select_for_update_of
+        else Auction.objects.select_for_update()
+    )
+    with transaction.atomic():
+        auction = auctions.select_related("artwork").get(pk=auction_id)
+        error = check_bid(auction, amount)
+        if error:
+            return BidResult(
+                accepted=False, current_price=auction.price, error=error
+            )
+        bid = Bids(
+            auction=auction,
+            bidder=bidder,
+            amount=amount,
+            bid_time=timezone.now(),
+        )
+        bid.save()
+    return BidResult(accepted=True, current_price=amount, bid=bid)
+
+
+def _place_optimistic(auction_id, bidder, amount):
+    for attempt in range(CAS_MAX_ATTEMPTS):
+        try:
+            auction = Auction.objects.select_related("artwork").get(
+                pk=auction_id
+            )
+            error = check_bid(auction, amount)
+            if error:
+                return BidResult(
+                    accepted=False, current_price=auction.price, error=error
+                )
+            bid = Bids(
+                auction=auction,
+                bidder=bidder,
+                amount=amount,
+                bid_time=timezone.now(),
+            )
+            with transaction.atomic():
+                bid.save(apply_to_auction=False)
+                swapped = auction.apply_bid(
+                    bid, expected_count=auction.bid_count
+                )
+                if not swapped:
+                    raise StaleBidError()
+        except StaleBidError:
+            continue
+        except OperationalError as e:
+            # SQLite reports write contention as "database is locked";
+            # treat it like a lost race and retry after a short pause.
+            if "locked" not in str(e):
+                raise
+            time.sleep(0.001 * (attempt + 1))
+            continue
+        return BidResult(accepted=True, current_price=amount, bid=bid)
+    logger.warning(
+        f"Giving up on bid for auction {auction_id} "
+        f"after {CAS_MAX_ATTEMPTS} conflicting attempts"
+    )
+    return BidResult(
+        accepted=False,
+        current_price=Auction.objects.get(pk=auction_id).price,
+        error="The auction is busy, please try again.",
+    )
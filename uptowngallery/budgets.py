@@ -0,0 +1,91 @@
+import json
+import math
+import os
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), "perf_budgets.json")
+
+
+def load_budgets(path=BUDGETS_PATH):
+    """
+    Load the per-view budgets: for each URL name and audience
+    ("anonymous" or "authenticated"), the most queries one
+    uncached request may run and the p95 render time in ms.
+    """
+    with open(path) as budgets_file:
+        return json.load(budgets_file)
+
+
+def percentile(samples, fraction):
+    """
+    Nearest-rank percentile of a list of samples.
+    """
+    ordered = sorted(samples)
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def measure(client, url, repeat=10):
+    """
+    Request `url` `repeat` times with `client`.
+    The first request runs against an empty cache and its
+    query count is the one reported, so cached views are
+    budgeted for their worst case; render times cover every run.
+    """
+    cache.clear()
+    timings = []
+    queries = None
+    status_code = None
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+        if queries is None:
+            queries = len(captured)
+            status_code = response.status_code
+    return {
+        "url": url,
+        "status_code": status_code,
+        "queries": queries,
+        "p50_ms": round(percentile(timings, 0.5), 2),
+        "p95_ms": round(percentile(timings, 0.95), 2),
+    }
+
+
+def over_budget(result, budget):
+    """
+    Return a description of each budget the result exceeds.
+    """
+    problems = []
+    if result["queries"] > budget["queries"]:
+        problems.append(
+            f"{result['queries']} queries (budget {budget['queries']})"
+        )
+    if result["p95_ms"] > budget["p95_ms"]:
+        problems.append(
+            f"p95 {result['p95_ms']}ms (budget {budget['p95_ms']}ms)"
+        )
+    return problems
+
+
+def write_report(results, path=None):
+    """
+    Write the measured results as JSON to
+    settings.PERF_BUDGET_REPORT so they can be compared
+    across commits. Returns the path written.
+    """
+    path = path or settings.PERF_BUDGET_REPORT
+    report = {
+        "generated_at": timezone.now().isoformat(),
+        "database": connection.vendor,
+        "results": results,
+    }
+    with open(path, "w") as report_file:
+        json.dump(report, report_file, indent=2, sort_keys=True)
+    return path
@@ -0,0 +1,157 @@
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.safestring import mark_safe
+
+ALL_CATEGORIES = "*"
+FRAGMENT_NAMES = (
+    "artwork_grid",
+    "recent_artworks",
+    "auction_state",
+    "renditions",
+)
+FRAGMENT_TIMEOUT = 60 * 15
+AUCTION_STATE_KEY = "auction-state:{auction_id}"
+AUCTION_STATE_TIMEOUT = 5
+RENDITIONS_KEY = "renditions:{artwork_id}:{public_id}:{name}"
+RENDITIONS_TIMEOUT = 60 * 60 * 24
+STATS_KEY = "cache-stats:{name}:{outcome}"
+VERSION_KEY = "catalogue-version:{category}"
+
+
+def is_shared_cache():
+    """
+    Whether other processes see this process's cache writes.
+    Background processes that invalidate cached pages (the closer
+    and ingest processes) only reach the web process through a
+    shared cache.
+    """
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+def catalogue_version(category=None):
+    """
+    Return the current cache version for a category's listing,
+    or for the unfiltered listing when no category is given.
+    """
+    key = VERSION_KEY.format(category=category or ALL_CATEGORIES)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def invalidate_catalogue(*categories):
+    """
+    Bump the cache version of the given categories and of the
+    unfiltered listing, so every cached fragment showing
+    artworks from those categories is rebuilt on next request.
+    """
+    for category in {ALL_CATEGORIES, *filter(None, categories)}:
+        key = VERSION_KEY.format(category=category)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 2, timeout=None)
+
+
+def cached_value(name, key_parts, build, category=None):
+    """
+    Return the cached value for `name` and `key_parts`
+    under the current catalogue version, calling `build`
+    and storing the result on a miss.
+    Hits and misses are counted per name (see cache_stats).
+    """
+    version = catalogue_version(category)
+    parts = ":".join(str(part) for part in key_parts)
+    key = f"{name}:{category or ALL_CATEGORIES}:v{version}:{parts}"
+    value = cache.get(key)
+    if value is not None:
+        _count(name, "hits")
+        return value
+    _count(name, "misses")
+    value = build()
+    cache.set(key, value, timeout=FRAGMENT_TIMEOUT)
+    return value
+
+
+def cached_fragment(name, key_parts, render, category=None):
+    """
+    Same as cached_value, for rendered template fragments.
+    """
+    return mark_safe(cached_value(name, key_parts, render, category))
+
+
+def cached_auction_state(auction_id, build):
+    """
+    Return an auction's cached state, calling `build` on a miss.
+    State entries live for AUCTION_STATE_TIMEOUT seconds and are
+    dropped as soon as a bid or status change commits, so the short
+    TTL only bounds staleness for writes that bypass the signals.
+    """
+    key = AUCTION_STATE_KEY.format(auction_id=auction_id)
+    value = cache.get(key)
+    if value is not None:
+        _count("auction_state", "hits")
+        return value
+    _count("auction_state", "misses")
+    value = build()
+    if value is not None:
+        cache.set(key, value, timeout=AUCTION_STATE_TIMEOUT)
+    return value
+
+
+def invalidate_auction_state(*auction_ids):
+    """
+    Drop the cached state of the given auctions.
+    """
+    cache.delete_many(
+        [AUCTION_STATE_KEY.format(auction_id=pk) for pk in auction_ids]
+    )
+
+
+def cached_renditions(artwork_id, public_id, name, build):
+    """
+    Return an artwork's cached rendition URLs, calling `build`
+    on a miss. The key includes the image's public id, so
+    replacing the image never serves stale URLs.
+    """
+    key = RENDITIONS_KEY.format(
+        artwork_id=artwork_id, public_id=public_id, name=name
+    )
+    value = cache.get(key)
+    if value is not None:
+        _count("renditions", "hits")
+        return value
+    _count("renditions", "misses")
+    value = build()
+    cache.set(key, value, timeout=RENDITIONS_TIMEOUT)
+    return value
+
+
+def cache_stats():
+    """
+    Return hit and miss counts for every cached fragment name.
+    """
+    stats = {}
+    for name in FRAGMENT_NAMES:
+        keys = {
+            outcome: STATS_KEY.format(name=name, outcome=outcome)
+            for outcome in ("hits", "misses")
+        }
+        values = cache.get_many(keys.values())
+        stats[name] = {
+            outcome: values.get(key, 0) for outcome, key in keys.items()
+        }
+    return stats
+
+
+def _count(name, outcome):
+    key = STATS_KEY.format(name=name, outcome=outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
@@ -0,0 +1,103 @@
+import logging
+from django.db import connection, transaction
+from django.db.models import DecimalField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from .models import Auction, CatalogEntry
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+# Newest first; artwork_id (the primary key) breaks ties
+# and makes the ordering usable by KeysetPaginator.
+CATALOG_ORDERING = ("-create_date", "-artwork_id")
+
+INSERT_ENTRIES = """
+INSERT INTO uptowngallery_catalogentry
+    (artwork_id, auction_id, title, category, artist_name, image,
+    current_price, end_date, create_date)
+SELECT artwork.id, auction.id, artwork.title, artwork.category,
+    profile.name, artwork.image,
+    coalesce(auction.current_price, auction.reserve_price),
+    auction.end_date, artwork.create_date
+FROM uptowngallery_auction AS auction
+JOIN uptowngallery_artwork AS artwork ON artwork.id = auction.artwork_id
+LEFT JOIN uptowngallery_userprofile AS profile
+    ON profile.id = artwork.artist_id
+WHERE artwork.approval_status = 'approved' AND auction.id IN (
+    SELECT max(id) FROM uptowngallery_auction
+    WHERE status = 'active' {artworks}
+    GROUP BY artwork_id
+)
+"""
+
+
+def refresh_catalog(artwork_ids):
+    """
+    Rewrite the catalogue rows of the given artworks from the
+    Artwork, Auction and UserProfile tables: an approved artwork
+    with an active auction gets a row for its most recent one,
+    any other artwork loses its row. One DELETE and one
+    INSERT ... SELECT per BATCH_SIZE artworks.
+    """
+    artwork_ids = list(artwork_ids)
+    with transaction.atomic():
+        for start in range(0, len(artwork_ids), BATCH_SIZE):
+            batch = artwork_ids[start : start + BATCH_SIZE]
+            CatalogEntry.objects.filter(artwork_id__in=batch).delete()
+            placeholders = ", ".join(["%s"] * len(batch))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    INSERT_ENTRIES.format(
+                        artworks=f"AND artwork_id IN ({placeholders})"
+                    ),
+                    batch,
+                )
+
+
+def rebuild_catalog():
+    """
+    Rebuild the whole catalogue with one DELETE and one
+    INSERT ... SELECT, after writes that bypass the write paths
+    keeping it in step (bulk_create, fixtures, raw SQL).
+    Returns the number of entries.
+    """
+    with transaction.atomic():
+        CatalogEntry.objects.all().delete()
+        with connection.cursor() as cursor:
+            cursor.execute(INSERT_ENTRIES.format(artworks=""))
+        count = CatalogEntry.objects.count()
+    logger.info(f"Rebuilt the catalogue with {count} entries")
+    return count
+
+
+def remove_auctions(auction_ids):
+    """
+    Drop the catalogue rows of auctions that closed
+    or were deleted.
+    """
+    return CatalogEntry.objects.filter(auction_id__in=auction_ids).delete()[0]
+
+
+def refresh_prices(auctions):
+    """
+    Copy the current price of a queryset of auctions into their
+    catalogue rows, after their denormalized bid columns were
+    recomputed (see refresh_auction_stats).
+    """
+    price = Auction.objects.filter(pk=OuterRef("auction_id")).values(
+        price=Coalesce(
+            "current_price", "reserve_price", output_field=DecimalField()
+        )
+    )[:1]
+    return CatalogEntry.objects.filter(auction__in=auctions).update(
+        current_price=Subquery(price)
+    )
+
+
+def update_artist_name(profile):
+    """
+    Show an artist's new name on their catalogue rows.
+    """
+    return CatalogEntry.objects.filter(artwork__artist=profile).update(
+        artist_name=profile.name
+    )
@@ -0,0 +1,81 @@
+import hashlib
+from django.contrib.messages import get_messages
+from django.db.models import Subquery
+from django.views.decorators.http import condition
+from .cache import catalogue_version
+from .models import Artwork, Auction
+
+
+def catalogue_last_modified(request, *args, **kwargs):
+    """
+    When any artwork or auction last changed.
+    Bids bump their auction's updated_at, so this covers them too.
+    One query, answered from the two updated_at indexes.
+    """
+    latest_auction = Auction.objects.order_by("-updated_at").values(
+        "updated_at"
+    )[:1]
+    row = (
+        Artwork.objects.order_by("-updated_at")
+        .annotate(auction_updated_at=Subquery(latest_auction))
+        .values("updated_at", "auction_updated_at")
+        .first()
+    )
+    if row is None:
+        return None
+    return max(filter(None, row.values()))
+
+
+def auction_last_modified(request, artwork_id, auction_id):
+    """
+    When the auction, its artwork or its bids last changed.
+    """
+    row = (
+        Auction.objects.filter(pk=auction_id, artwork_id=artwork_id)
+        .values("updated_at", "artwork__updated_at", "last_bid_at")
+        .first()
+    )
+    if row is None:
+        return None
+    return max(filter(None, row.values()))
+
+
+def conditional_page(last_modified, versioned=False):
+    """
+    Decorator for a view's GET handler that sends an ETag and
+    answers a matching If-None-Match with 304 through Django's
+    `condition` decorator.
+    `last_modified(request, *args, **kwargs)` is evaluated once per request
+    and feeds the ETag, which also covers the URL and the user, because
+    pages show who is logged in. With `versioned`, it also covers the
+    catalogue cache version, which catches deletions.
+    No Last-Modified header is sent: a timestamp cannot tell users apart
+    or see a deleted row, so If-Modified-Since would answer stale 304s.
+    Requests with pending flash messages are always rendered.
+    """
+
+    def cached_last_modified(request, *args, **kwargs):
+        if not hasattr(request, "_page_last_modified"):
+            request._page_last_modified = (
+                None
+                if len(get_messages(request))
+                else last_modified(request, *args, **kwargs)
+            )
+        return request._page_last_modified
+
+    def etag(request, *args, **kwargs):
+        modified = cached_last_modified(request, *args, **kwargs)
+        if modified is None:
+            return None
+        parts = [
+            request.get_full_path(),
+            request.user.pk or "",
+            modified.isoformat(),
+        ]
+        if versioned:
+            parts.append(catalogue_version())
+        return hashlib.md5(
+            "|".join(str(part) for part in parts).encode()
+        ).hexdigest()[:16]
+
+    return condition(etag_func=etag)
@@ -0,0 +1,132 @@
+import logging
+import os
+import threading
+import time
+import dj_database_url
+from .metrics import DB_CONNECT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Engines wrapped so that connection setup is timed (see TimedConnectMixin).
+INSTRUMENTED_ENGINES = {
+    "django.db.backends.postgresql": "uptowngallery.db_backends.postgresql",
+    "django.db.backends.sqlite3": "uptowngallery.db_backends.sqlite3",
+}
+DEFAULT_CONN_MAX_AGE = 600
+SLOW_CONNECT_SECONDS = 0.5
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def database_settings(environ=os.environ):
+    """
+    Build the default DATABASES entry from the environment.
+    - DATABASE_URL: the database to use.
+    - DB_POOL=pgbouncer: connect through the PgBouncer pool at
+      DATABASE_CONNECTION_POOL_URL (falling back to DATABASE_URL,
+      for a pooler running next to the app). Server-side cursors
+      are disabled, since transaction pooling cannot keep them.
+    - DB_CONN_MAX_AGE: seconds to keep a connection between
+      requests (default 600; 0 closes it after every request).
+      The ASGI entry point defaults it to 0 (see gallery_site/asgi.py).
+    Persistent connections are health-checked before reuse.
+    """
+    pooled = environ.get("DB_POOL", "none") == "pgbouncer"
+    url = environ.get("DATABASE_URL")
+    if pooled:
+        url = environ.get("DATABASE_CONNECTION_POOL_URL") or url
+    config = dj_database_url.parse(
+        url,
+        conn_max_age=int(
+            environ.get("DB_CONN_MAX_AGE", DEFAULT_CONN_MAX_AGE)
+        ),
+        conn_health_checks=True,
+    )
+    if pooled:
+        config["DISABLE_SERVER_SIDE_CURSORS"] = True
+    config["ENGINE"] = INSTRUMENTED_ENGINES.get(
+        config["ENGINE"], config["ENGINE"]
+    )
+    return config
+
+
+def connection_budget(environ=os.environ):
+    """
+    How many database connections the web process can hold at once:
+    one per thread that runs views, in every worker.
+    Workers come from WEB_CONCURRENCY (by default two, and always
+    one with the in-memory EVENT_BROKER, as in gunicorn.conf.py);
+    threads depend on the gunicorn profile: GUNICORN_THREADS for
+    gthread, one for sync, and asgiref's ASGI_THREADS for uvicorn.
+    Use `per_dyno` times the dyno count to size the PgBouncer pool
+    (PGBOUNCER_DEFAULT_POOL_SIZE) and check it against the
+    database's connection limit.
+    """
+    shared_events = environ.get("EVENT_BROKER", "memory") != "memory"
+    workers = int(environ.get("WEB_CONCURRENCY", 2)) if shared_events else 1
+    profile = environ.get("GUNICORN_PROFILE", "uvicorn")
+    if profile == "gthread":
+        threads = int(environ.get("GUNICORN_THREADS", 4))
+    elif profile == "sync":
+        threads = 1
+    else:
+        threads = int(
+            environ.get("ASGI_THREADS", min(32, (os.cpu_count() or 1) + 4))
+        )
+    return {
+        "workers": workers,
+        "threads": threads,
+        "per_worker": threads,
+        "per_dyno": workers * threads,
+    }
+
+
+class TimedConnectMixin:
+    """
+    Records how long each new database connection takes to open,
+    per connection alias (see connection_stats).
+    """
+
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        record_connect(self.alias, time.perf_counter() - started)
+
+
+def record_connect(alias, seconds):
+    with _stats_lock:
+        stats = _stats.setdefault(
+            alias, {"connects": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+        )
+        stats["connects"] += 1
+        stats["total_seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+    DB_CONNECT_SECONDS.labels(alias).observe(seconds)
+    if seconds > SLOW_CONNECT_SECONDS:
+        logger.warning(
+            f"Opening a database connection ({alias}) took {seconds:.3f}s"
+        )
+
+
+def connection_stats():
+    """
+    Return, per alias, how many connections this process opened
+    and their average and slowest setup times in milliseconds.
+    """
+    with _stats_lock:
+        return {
+            alias: {
+                "connects": stats["connects"],
+                "avg_ms": round(
+                    stats["total_seconds"] * 1000 / stats["connects"], 3
+                ),
+                "max_ms": round(stats["max_seconds"] * 1000, 3),
+            }
+            for alias, stats in _stats.items()
+        }
+
+
+def reset_connection_stats():
+    with _stats_lock:
+        _stats.clear()
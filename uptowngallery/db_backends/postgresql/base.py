@@ -0,0 +1,8 @@
+from django.db.backends.postgresql import base
+from uptowngallery.db import TimedConnectMixin
+
+
+class DatabaseWrapper(TimedConnectMixin, base.DatabaseWrapper):
+    """
+    The PostgreSQL backend, with connection setup timed.
+    """
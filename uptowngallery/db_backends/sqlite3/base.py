@@ -0,0 +1,8 @@
+from django.db.backends.sqlite3 import base
+from uptowngallery.db import TimedConnectMixin
+
+
+class DatabaseWrapper(TimedConnectMixin, base.DatabaseWrapper):
+    """
+    The SQLite backend, with connection setup timed.
+    """
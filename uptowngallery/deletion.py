@@ -0,0 +1,234 @@
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from django.db import connection, transaction
+from django.utils import timezone
+from .cache import invalidate_auction_state, invalidate_catalogue
+from .models import (
+    Artwork,
+    Auction,
+    Bids,
+    CatalogEntry,
+    ImageUpload,
+    OrphanedImage,
+)
+from .profiling import timed
+from .search import remove_artworks
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+PURGE_BATCH_SIZE = 100
+MAX_ATTEMPTS = 6
+RETRY_BASE_SECONDS = 60
+
+
+@dataclass
+class DeletionResult:
+    artworks: int = 0
+    auctions: int = 0
+    bids: int = 0
+    images: int = 0
+
+    def __add__(self, other):
+        return DeletionResult(
+            self.artworks + other.artworks,
+            self.auctions + other.auctions,
+            self.bids + other.bids,
+            self.images + other.images,
+        )
+
+    def __str__(self):
+        return (
+            f"{self.artworks} artworks, {self.auctions} auctions, "
+            f"{self.bids} bids deleted; {self.images} images queued for cleanup"
+        )
+
+
+def delete_artworks(artworks, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Delete artworks (a queryset or ids) with their auctions and bids.
+    Each chunk of `chunk_size` artworks is removed in its own short
+    transaction: one DELETE per table, with no per-row signals.
+    The work those signals would do is done here in bulk instead:
+    - dropping the artworks from the search index and the catalogue;
+    - invalidating the listing and auction state caches;
+    - queueing the Cloudinary images for the purge_images worker.
+    Returns a DeletionResult with the counts.
+    """
+    result = DeletionResult()
+    for chunk in _chunks(_ids(artworks), chunk_size):
+        result += _delete_artwork_chunk(chunk)
+    logger.info(f"Deleted artworks: {result}")
+    return result
+
+
+def delete_auctions(auctions, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Delete auctions (a queryset or ids) and their bids,
+    chunk by chunk like delete_artworks.
+    Returns a DeletionResult with the counts.
+    """
+    result = DeletionResult()
+    for chunk in _chunks(_ids(auctions), chunk_size):
+        with transaction.atomic():
+            categories = set(
+                Artwork.objects.filter(auctions__id__in=chunk).values_list(
+                    "category", flat=True
+                )
+            )
+            _raw_delete(CatalogEntry.objects.filter(auction_id__in=chunk))
+            result.bids += _raw_delete(Bids.objects.filter(auction_id__in=chunk))
+            result.auctions += _raw_delete(Auction.objects.filter(pk__in=chunk))
+            _invalidate_on_commit(categories, chunk)
+    logger.info(f"Deleted auctions: {result}")
+    return result
+
+
+def _delete_artwork_chunk(ids):
+    result = DeletionResult()
+    with transaction.atomic():
+        rows = list(
+            Artwork.objects.filter(pk__in=ids).values_list("category", "image")
+        )
+        auction_ids = list(
+            Auction.objects.filter(artwork_id__in=ids).values_list(
+                "pk", flat=True
+            )
+        )
+        _raw_delete(ImageUpload.objects.filter(artwork_id__in=ids))
+        _raw_delete(CatalogEntry.objects.filter(artwork_id__in=ids))
+        result.bids = _raw_delete(
+            Bids.objects.filter(auction__artwork_id__in=ids)
+        )
+        result.auctions = _raw_delete(
+            Auction.objects.filter(artwork_id__in=ids)
+        )
+        result.artworks = _raw_delete(Artwork.objects.filter(pk__in=ids))
+        remove_artworks(ids)
+        result.images = queue_image_cleanup(image for _, image in rows)
+        _invalidate_on_commit({category for category, _ in rows}, auction_ids)
+    return result
+
+
+def _raw_delete(queryset):
+    """
+    DELETE the matching rows with one statement, skipping the
+    deletion collector and the per-row pre/post_delete signals.
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+def _invalidate_on_commit(categories, auction_ids):
+    def invalidate():
+        invalidate_catalogue(*categories)
+        invalidate_auction_state(*auction_ids)
+
+    transaction.on_commit(invalidate)
+
+
+def _ids(objects):
+    if hasattr(objects, "values_list"):
+        return list(objects.values_list("pk", flat=True))
+    return list(objects)
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def queue_image_cleanup(images):
+    """
+    Queue Cloudinary assets (resources or public ids) for deletion
+    by the purge_images worker. Returns the number queued.
+    """
+    public_ids = {
+        getattr(image, "public_id", image) for image in images if image
+    }
+    public_ids.discard(None)
+    OrphanedImage.objects.bulk_create(
+        [OrphanedImage(public_id=public_id) for public_id in public_ids],
+        ignore_conflicts=True,
+    )
+    return len(public_ids)
+
+
+def purge_orphaned_images(batch_size=PURGE_BATCH_SIZE, now=None):
+    """
+    Destroy up to `batch_size` queued Cloudinary assets with a single
+    Admin API call (the API accepts up to 100 public ids at a time).
+    Failures are retried with exponential backoff and marked
+    failed after MAX_ATTEMPTS.
+    Returns a (purged, failed) tuple of counts.
+    """
+    import cloudinary.api
+
+    now = now or timezone.now()
+    with transaction.atomic():
+        due = OrphanedImage.objects.filter(
+            status="pending", next_attempt_at__lte=now
+        ).order_by("next_attempt_at", "id")
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        images = list(due[:min(batch_size, PURGE_BATCH_SIZE)])
+        if not images:
+            return 0, 0
+        images = _drop_shared(images)
+        if not images:
+            return 0, 0
+        try:
+            with timed("cloudinary"):
+                response = cloudinary.api.delete_resources(
+                    [image.public_id for image in images]
+                )
+        except Exception as e:
+            outcomes = {}
+            error = e
+        else:
+            outcomes = response.get("deleted", {})
+            error = "Not deleted by Cloudinary"
+        purged = [
+            image.pk
+            for image in images
+            if outcomes.get(image.public_id) in ("deleted", "not_found")
+        ]
+        OrphanedImage.objects.filter(pk__in=purged).delete()
+        failed = [image for image in images if image.pk not in purged]
+        for image in failed:
+            _schedule_retry(image, error, now)
+    if failed:
+        logger.warning(f"{len(failed)} orphaned images failed to purge")
+    return len(purged), len(failed)
+
+
+def _drop_shared(images):
+    """
+    Ingested images are stored once per content hash, so another
+    artwork may still show an orphaned asset. Forget those
+    rows without deleting the asset; return the rest.
+    """
+    in_use = {
+        getattr(image, "public_id", image)
+        for image in Artwork.objects.filter(
+            image__in=[image.public_id for image in images]
+        ).values_list("image", flat=True)
+    }
+    OrphanedImage.objects.filter(
+        pk__in=[image.pk for image in images if image.public_id in in_use]
+    ).delete()
+    return [image for image in images if image.public_id not in in_use]
+
+
+def _schedule_retry(image, error, now):
+    image.attempts += 1
+    image.last_error = str(error)
+    if image.attempts >= MAX_ATTEMPTS:
+        image.status = "failed"
+        logger.error(f"Giving up on orphaned image {image.public_id}: {error}")
+    else:
+        delay = RETRY_BASE_SECONDS * 2 ** (image.attempts - 1)
+        image.next_attempt_at = now + timedelta(seconds=delay)
+    image.save(
+        update_fields=["attempts", "last_error", "status", "next_attempt_at"]
+    )
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import logging
+import threading
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 100
+CHANNEL_PREFIX = "auction-events:"
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+class Subscription:
+    """
+    One client's view of an auction's event stream.
+    Events are queued on the subscriber's own event loop;
+    a subscriber that falls behind loses its oldest events
+    rather than slowing the publisher down.
+    """
+
+    def __init__(self, broker, auction_id):
+        self.broker = broker
+        self.auction_id = auction_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, event):
+        """
+        Queue an event; must run on the subscriber's loop.
+        """
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """
+    Fans events out to the subscribers of this process.
+    Publishing is thread-safe and costs one hand-off per
+    subscriber, however many watchers an auction has;
+    nothing is re-rendered or re-queried per watcher.
+    Only reaches subscribers in the publishing process,
+    so multi-process deployments use RedisBroker.
+    """
+
+    def __init__(self, url=None):
+        self.subscribers = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, auction_id):
+        subscription = Subscription(self, auction_id)
+        with self.lock:
+            self.subscribers.setdefault(auction_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            watchers = self.subscribers.get(subscription.auction_id, set())
+            watchers.discard(subscription)
+            if not watchers:
+                self.subscribers.pop(subscription.auction_id, None)
+
+    def subscriber_count(self, auction_id):
+        return len(self.subscribers.get(auction_id, ()))
+
+    def publish(self, auction_id, event):
+        self.deliver(auction_id, event)
+
+    def deliver(self, auction_id, event):
+        """
+        Hand an event to every local subscriber of the auction.
+        """
+        with self.lock:
+            watchers = list(self.subscribers.get(auction_id, ()))
+        for subscription in watchers:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.offer, event
+                )
+            except RuntimeError:
+                # The subscriber's loop has shut down.
+                self.unsubscribe(subscription)
+
+
+class RedisBroker(InProcessBroker):
+    """
+    Publishes events through Redis pub/sub so every web process
+    receives them. Each process holds a single pattern
+    subscription and fans out to its own clients in memory.
+    Requires the redis package.
+    """
+
+    def __init__(self, url=None):
+        super().__init__()
+        import redis
+
+        self.url = url or "redis://localhost:6379/0"
+        self.client = redis.Redis.from_url(self.url)
+        self.listener = None
+
+    def subscribe(self, auction_id):
+        self.start_listener()
+        return super().subscribe(auction_id)
+
+    def publish(self, auction_id, event):
+        self.client.publish(f"{CHANNEL_PREFIX}{auction_id}", json.dumps(event))
+
+    def start_listener(self):
+        with self.lock:
+            if self.listener is None:
+                self.listener = threading.Thread(
+                    target=self.listen, name="bid-event-listener", daemon=True
+                )
+                self.listener.start()
+
+    def listen(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+        for message in pubsub.listen():
+            try:
+                channel = message["channel"].decode()
+                auction_id = int(channel[len(CHANNEL_PREFIX):])
+                self.deliver(auction_id, json.loads(message["data"]))
+            except (KeyError, ValueError) as e:
+                logger.error(f"Ignoring malformed bid event: {e}")
+
+
+def get_broker():
+    """
+    Return the process-wide broker named by settings.EVENT_BROKER.
+    """
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            broker_class = import_string(settings.EVENT_BROKER)
+            _broker = broker_class(settings.EVENT_BROKER_URL)
+        return _broker
+
+
+def publish_event(auction_id, event_type, **data):
+    """
+    Publish an event to everyone watching an auction.
+    Failures are logged: live updates are best-effort and
+    must never fail the write that triggered them.
+    """
+    event = {"type": event_type, "auction_id": auction_id, **data}
+    try:
+        get_broker().publish(auction_id, event)
+    except Exception as e:
+        logger.error(f"Error publishing {event_type} event: {e}")
+
+
+def format_event(event):
+    """
+    Encode an event as a Server-Sent Events message.
+    """
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
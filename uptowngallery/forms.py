@@ -1,6 +1,7 @@
 from django import forms
+from django.db import transaction
+from .ingestion import stage_image
 from .models import Artwork, Auction, Bids
-import cloudinary.uploader
 from decimal import Decimal, InvalidOperation
 from allauth.account.forms import SignupForm
 from django.contrib.auth import get_user_model
@@ -30,7 +31,8 @@ class ArtworkCreateForm(forms.ModelForm):
     Save Method:
     Creates Artwork instance,
     optionally linking to a user profile.
-    ploads image to Cloudinary and saves the URL.
+    Stages the image for the ingest_images worker,
+    which uploads it to Cloudinary.
     Creates associated Auction object with status
     'pending' and sets duration.
     Purpose: Manages creation and
@@ -107,20 +109,20 @@ class ArtworkCreateForm(forms.ModelForm):
             artwork.artist = user_profile
 
         if commit:
-            try:
+            # The image is staged and uploaded by the ingest_images
+            # worker, rather than by the field while the request waits.
+            image = self.cleaned_data.get("image")
+            artwork.image = None
+            with transaction.atomic():
                 artwork.save()
-                image = self.cleaned_data.get("image")
                 if image:
-                    upload_result = cloudinary.uploader.upload(image)
-                    artwork.image_url = upload_result.get("url")
+                    stage_image(artwork, image)
                 duration = int(
                     self.cleaned_data.get("auction_duration")
                 )
                 Auction.objects.create(
                     artwork=artwork, status="pending", duration=duration
                 )
-            except Exception as e:
-                print(f"Error saving artwork: {e}")
 
         return artwork
 
@@ -232,12 +234,10 @@ class BidForm(forms.ModelForm):
                 raise ValidationError(
                     "Bid amount cannot be lower than the reserve price."
                 )
-            current_highest_bid = self.auction.bids.order_by(
-                "-amount"
-            ).first()
+            current_highest_bid = self.auction.current_price
             if (
-                current_highest_bid
-                and amount <= current_highest_bid.amount
+                current_highest_bid is not None
+                and amount <= current_highest_bid
             ):
                 raise ValidationError(
                     "Your bid is not higher than the current highest bid."
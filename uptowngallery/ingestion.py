@@ -0,0 +1,226 @@
+import hashlib
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .cache import invalidate_auction_state, invalidate_catalogue
+from .models import (
+    Artwork,
+    Auction,
+    CatalogEntry,
+    ImageUpload,
+    OrphanedImage,
+)
+from .profiling import timed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 20
+MAX_ATTEMPTS = 6
+RETRY_BASE_SECONDS = 30
+LEASE_SECONDS = 300
+PUBLIC_ID_PREFIX = "artworks/"
+
+
+class CloudinaryBackend:
+    """
+    Uploads images to Cloudinary under a public id derived
+    from their content, so an image that is already there
+    is never stored twice.
+    """
+
+    def upload(self, file, public_id):
+        import cloudinary.uploader
+
+        with timed("cloudinary"):
+            result = cloudinary.uploader.upload(
+                file,
+                public_id=public_id,
+                overwrite=False,
+                unique_filename=False,
+                resource_type="image",
+            )
+        return result["public_id"]
+
+
+class LocalBackend:
+    """
+    Stand-in for Cloudinary that keeps uploaded images on disk
+    under IMAGE_LOCAL_ROOT, for working and testing offline.
+    """
+
+    def __init__(self):
+        self.storage = FileSystemStorage(location=settings.IMAGE_LOCAL_ROOT)
+
+    def upload(self, file, public_id):
+        if not self.storage.exists(public_id):
+            self.storage.save(public_id, file)
+        return public_id
+
+
+def get_upload_backend():
+    """
+    Return the backend named by settings.IMAGE_UPLOAD_BACKEND.
+    """
+    return import_string(settings.IMAGE_UPLOAD_BACKEND)()
+
+
+def stage_image(artwork, file):
+    """
+    Store an uploaded image file in the database and queue it for
+    the ingest_images worker, so the request that received it does
+    not wait for Cloudinary. The ingest process runs on its own dyno,
+    which cannot read the web dyno's disk. Returns the ImageUpload.
+    """
+    data = b"".join(file.chunks())
+    return ImageUpload.objects.create(
+        artwork=artwork,
+        data=data,
+        content_hash=hashlib.sha256(data).hexdigest(),
+    )
+
+
+def ingest_staged_images(batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """
+    Upload up to `batch_size` due staged images and write their
+    public ids back to the artworks. An image whose content was
+    already uploaded reuses that public id without another upload.
+    The batch is claimed in a short transaction and uploaded
+    outside it, so slow uploads never hold database locks.
+    Failures are retried with exponential backoff and marked
+    failed after MAX_ATTEMPTS.
+    Returns an (uploaded, failed) tuple of counts.
+    """
+    now = now or timezone.now()
+    uploads = _claim(batch_size, now)
+    if not uploads:
+        return 0, 0
+    backend = get_upload_backend()
+    uploaded = failed = 0
+    for upload in uploads:
+        try:
+            public_id = _known_public_id(upload.content_hash)
+            if public_id is None:
+                public_id = backend.upload(
+                    ContentFile(_staged_data(upload)),
+                    f"{PUBLIC_ID_PREFIX}{upload.content_hash}",
+                )
+        except Exception as e:
+            _schedule_retry(upload, e, now)
+            failed += 1
+            continue
+        _write_back(upload, public_id, now)
+        uploaded += 1
+    if failed:
+        logger.warning(f"{failed} staged images failed to upload")
+    return uploaded, failed
+
+
+def _claim(batch_size, now):
+    """
+    Lease a batch of due uploads by pushing their next attempt
+    into the future, so other workers skip them meanwhile.
+    Their image data is only read when it has to be uploaded.
+    """
+    with transaction.atomic():
+        due = (
+            ImageUpload.objects.filter(
+                status="pending", next_attempt_at__lte=now
+            )
+            .defer("data")
+            .order_by("next_attempt_at", "id")
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        uploads = list(due[:batch_size])
+        ImageUpload.objects.filter(pk__in=[u.pk for u in uploads]).update(
+            next_attempt_at=now + timedelta(seconds=LEASE_SECONDS)
+        )
+    return uploads
+
+
+def _staged_data(upload):
+    data = (
+        ImageUpload.objects.filter(pk=upload.pk)
+        .values_list("data", flat=True)
+        .get()
+    )
+    if data is None:
+        raise ValueError("The staged image data is missing.")
+    return bytes(data)
+
+
+def _known_public_id(content_hash):
+    return (
+        ImageUpload.objects.filter(content_hash=content_hash, status="uploaded")
+        .values_list("public_id", flat=True)
+        .first()
+    )
+
+
+def _write_back(upload, public_id, now):
+    with transaction.atomic():
+        upload.status = "uploaded"
+        upload.public_id = public_id
+        upload.uploaded_at = now
+        upload.last_error = ""
+        upload.data = None
+        upload.save(
+            update_fields=[
+                "status",
+                "public_id",
+                "uploaded_at",
+                "last_error",
+                "data",
+            ]
+        )
+        updated = Artwork.objects.filter(pk=upload.artwork_id).update(
+            image=public_id, updated_at=now
+        )
+        if not updated:
+            # The artwork was deleted while its image was uploading.
+            OrphanedImage.objects.bulk_create(
+                [OrphanedImage(public_id=public_id)], ignore_conflicts=True
+            )
+            return
+        CatalogEntry.objects.filter(artwork_id=upload.artwork_id).update(
+            image=public_id
+        )
+        categories = list(
+            Artwork.objects.filter(pk=upload.artwork_id).values_list(
+                "category", flat=True
+            )
+        )
+        auction_ids = list(
+            Auction.objects.filter(artwork_id=upload.artwork_id).values_list(
+                "pk", flat=True
+            )
+        )
+
+        def invalidate():
+            invalidate_catalogue(*categories)
+            invalidate_auction_state(*auction_ids)
+
+        transaction.on_commit(invalidate)
+
+
+def _schedule_retry(upload, error, now):
+    upload.attempts += 1
+    upload.last_error = str(error)
+    if upload.attempts >= MAX_ATTEMPTS:
+        upload.status = "failed"
+        upload.data = None
+        logger.error(
+            f"Giving up on image upload for artwork {upload.artwork_id}: {error}"
+        )
+    else:
+        delay = RETRY_BASE_SECONDS * 2 ** (upload.attempts - 1)
+        upload.next_attempt_at = now + timedelta(seconds=delay)
+    fields = ["attempts", "last_error", "status", "next_attempt_at"]
+    if upload.status == "failed":
+        fields.append("data")
+    upload.save(update_fields=fields)
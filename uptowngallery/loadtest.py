@@ -0,0 +1,186 @@
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+from importlib import import_module
+import requests
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+    get_user_model,
+)
+from django.utils import timezone
+from .budgets import percentile
+from .catalog import refresh_catalog
+from .models import Artwork, Auction, UserProfile
+
+USER_PREFIX = "loadtest-"
+STEPS = ("listing", "modal", "detail", "bid")
+AUCTION_ID = re.compile(r'data-auction-id="(\d+)"')
+CSRF_TOKEN = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+BID_INCREMENT = Decimal("1.00")
+
+
+@dataclass
+class Sample:
+    step: str
+    seconds: float
+    ok: bool
+
+
+def prepare(users, auctions):
+    """
+    Make sure there are `users` bidders and at least `auctions`
+    active auctions (owned by a separate artist) to bid on,
+    and return a session key per bidder, so the scenario
+    does not have to go through the login form.
+    """
+    User = get_user_model()
+    artist_user, _ = User.objects.get_or_create(username=f"{USER_PREFIX}artist")
+    artist, _ = UserProfile.objects.get_or_create(user=artist_user)
+    missing = auctions - Auction.objects.filter(status="active").count()
+    if missing > 0:
+        now = timezone.now()
+        artworks = Artwork.objects.bulk_create(
+            Artwork(
+                title=f"Load test artwork {i}",
+                category="painting",
+                artist=artist,
+                reserve_price=10,
+                approved=True,
+                approval_status="approved",
+                auction_start=now,
+            )
+            for i in range(missing)
+        )
+        Auction.objects.bulk_create(
+            Auction(
+                artwork=artwork,
+                status="active",
+                is_active=True,
+                reserve_price=10,
+                create_date=now,
+                end_date=now + timedelta(days=7),
+            )
+            for artwork in artworks
+        )
+        refresh_catalog(artwork.pk for artwork in artworks)
+    store_class = import_module(settings.SESSION_ENGINE).SessionStore
+    session_keys = []
+    for i in range(users):
+        user, _ = User.objects.get_or_create(username=f"{USER_PREFIX}{i}")
+        UserProfile.objects.get_or_create(user=user)
+        session = store_class()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        session_keys.append(session.session_key)
+    return session_keys
+
+
+def run_scenario(base_url, session_keys, iterations):
+    """
+    Run the browse, open modal, bid scenario `iterations` times
+    for every session key at once, one thread per virtual user,
+    against the server at `base_url`. Returns a report (see report).
+    """
+    samples = []
+    lock = threading.Lock()
+
+    def virtual_user(session_key):
+        http = requests.Session()
+        http.cookies.set(settings.SESSION_COOKIE_NAME, session_key)
+        for _ in range(iterations):
+            user_samples = _iteration(http, base_url)
+            with lock:
+                samples.extend(user_samples)
+
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=virtual_user, args=(key,))
+        for key in session_keys
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return report(samples, time.perf_counter() - started)
+
+
+def _iteration(http, base_url):
+    samples = []
+
+    def timed(step, method, url, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = http.request(method, url, timeout=30, **kwargs)
+        except requests.RequestException:
+            samples.append(Sample(step, time.perf_counter() - started, False))
+            return None
+        ok = response.status_code < 400
+        samples.append(Sample(step, time.perf_counter() - started, ok))
+        return response if ok else None
+
+    listing = timed("listing", "GET", f"{base_url}/artworks/")
+    auction_ids = AUCTION_ID.findall(listing.text) if listing else []
+    auction_ids = [pk for pk in auction_ids if pk != "None"]
+    if not auction_ids:
+        return samples
+    modal = timed(
+        "modal",
+        "GET",
+        f"{base_url}/api/auctions/{random.choice(auction_ids)}/state",
+    )
+    if modal is None:
+        return samples
+    state = modal.json()
+    detail_url = f"{base_url}{state['detail_url']}"
+    detail = timed("detail", "GET", detail_url)
+    token = CSRF_TOKEN.search(detail.text) if detail else None
+    if token is None:
+        return samples
+    timed(
+        "bid",
+        "POST",
+        detail_url,
+        data={
+            "amount": str(Decimal(state["current_price"]) + BID_INCREMENT),
+            "csrfmiddlewaretoken": token.group(1),
+        },
+        headers={"Referer": detail_url},
+        allow_redirects=False,
+    )
+    return samples
+
+
+def report(samples, seconds):
+    """
+    Summarise samples: overall throughput, and per step the
+    request and error counts with p50/p95/p99 latency in ms.
+    """
+    steps = {}
+    for step in STEPS:
+        timings = [s.seconds * 1000 for s in samples if s.step == step]
+        if not timings:
+            continue
+        steps[step] = {
+            "requests": len(timings),
+            "errors": sum(
+                1 for s in samples if s.step == step and not s.ok
+            ),
+            "p50_ms": round(percentile(timings, 0.5), 1),
+            "p95_ms": round(percentile(timings, 0.95), 1),
+            "p99_ms": round(percentile(timings, 0.99), 1),
+        }
+    return {
+        "requests": len(samples),
+        "seconds": round(seconds, 2),
+        "throughput": round(len(samples) / seconds, 1) if seconds else 0,
+        "steps": steps,
+    }
@@ -0,0 +1,85 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.test import Client
+from uptowngallery.budgets import percentile
+from uptowngallery.db import (
+    connection_budget,
+    connection_stats,
+    reset_connection_stats,
+)
+
+MODES = (
+    ("fresh connection per request", 0),
+    ("persistent connection", 600),
+)
+
+
+class Command(BaseCommand):
+    """
+    Compare request latency when every request opens a new
+    database connection (CONN_MAX_AGE=0) with reusing one.
+    Requests go through the test client, with connections
+    closed and recycled between them as in a real request cycle.
+    Run it once against DATABASE_URL and once with
+    DB_POOL=pgbouncer to see what the pooler saves.
+    """
+
+    help = "Benchmark request latency with and without connection reuse."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=100,
+            help="Number of requests per mode.",
+        )
+        parser.add_argument(
+            "--path",
+            default="/artworks/",
+            help="Path to request.",
+        )
+
+    def handle(self, *args, **options):
+        connection = connections["default"]
+        max_age = connection.settings_dict["CONN_MAX_AGE"]
+        client = Client(HTTP_HOST="localhost")
+        self.stdout.write(
+            f"{options['requests']} requests to {options['path']} "
+            f"({connection.vendor}, {connection.settings_dict['ENGINE']})"
+        )
+        try:
+            for label, mode_max_age in MODES:
+                connection.close()
+                connection.settings_dict["CONN_MAX_AGE"] = mode_max_age
+                response = client.get(options["path"])
+                if response.status_code != 200:
+                    raise CommandError(
+                        f"{options['path']} answered {response.status_code}"
+                    )
+                close_old_connections()
+                reset_connection_stats()
+                timings = []
+                for _ in range(options["requests"]):
+                    started = time.perf_counter()
+                    close_old_connections()
+                    client.get(options["path"])
+                    close_old_connections()
+                    timings.append((time.perf_counter() - started) * 1000)
+                stats = connection_stats().get(
+                    "default", {"connects": 0, "avg_ms": 0}
+                )
+                self.stdout.write(
+                    f"{label}: p50 {percentile(timings, 0.5):.1f}ms, "
+                    f"p95 {percentile(timings, 0.95):.1f}ms, "
+                    f"{stats['connects']} connects "
+                    f"averaging {stats['avg_ms']:.1f}ms"
+                )
+        finally:
+            connection.close()
+            connection.settings_dict["CONN_MAX_AGE"] = max_age
+        budget = connection_budget()
+        self.stdout.write(
+            f"Connection budget: {budget['workers']} workers x "
+            f"{budget['threads']} threads = {budget['per_dyno']} per dyno."
+        )
@@ -0,0 +1,52 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from uptowngallery.cache import is_shared_cache
+from uptowngallery.auctions import DEFAULT_BATCH_SIZE, close_expired_auctions
+
+
+class Command(BaseCommand):
+    """
+    Close active auctions whose end date has passed.
+    Runs once by default; with --loop it keeps polling,
+    which is how the closer process in the Procfile runs it.
+    """
+
+    help = "Close expired auctions in bulk and send auctions_closed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of auctions closed per UPDATE statement.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, polling every --interval seconds.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=15,
+            help="Seconds to sleep between polls when looping.",
+        )
+
+    def handle(self, *args, **options):
+        if options["loop"] and not is_shared_cache():
+            raise CommandError(
+                "close_auctions --loop runs in its own process, whose cache "
+                "invalidations only reach the web process through a shared "
+                "cache: set CACHE_BACKEND to redis or db."
+            )
+        while True:
+            closed = close_expired_auctions(batch_size=options["batch_size"])
+            if closed or not options["loop"]:
+                self.stdout.write(f"Closed {closed} auctions.")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
+            # Apply CONN_MAX_AGE and health checks between polls,
+            # as Django does between requests.
+            close_old_connections()
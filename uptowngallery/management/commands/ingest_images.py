@@ -0,0 +1,60 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from uptowngallery.cache import is_shared_cache
+from uptowngallery.ingestion import DEFAULT_BATCH_SIZE, ingest_staged_images
+
+
+class Command(BaseCommand):
+    """
+    Upload the images staged by the artwork create form.
+    Runs until the queue is drained by default;
+    with --loop it keeps polling, which is how the
+    ingest process in the Procfile runs it.
+    """
+
+    help = "Upload staged artwork images in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of images claimed per batch.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, polling every --interval seconds.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to sleep between polls when looping.",
+        )
+
+    def handle(self, *args, **options):
+        if options["loop"] and not is_shared_cache():
+            raise CommandError(
+                "ingest_images --loop runs in its own process, whose cache "
+                "invalidations only reach the web process through a shared "
+                "cache: set CACHE_BACKEND to redis or db."
+            )
+        batch_size = options["batch_size"]
+        while True:
+            uploaded_total = failed_total = 0
+            while True:
+                uploaded, failed = ingest_staged_images(batch_size=batch_size)
+                uploaded_total += uploaded
+                failed_total += failed
+                if uploaded + failed < batch_size:
+                    break
+            if uploaded_total or failed_total or not options["loop"]:
+                self.stdout.write(
+                    f"Uploaded {uploaded_total} images, {failed_total} failed."
+                )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
+            close_old_connections()
@@ -0,0 +1,121 @@
+import os
+import subprocess
+import sys
+import time
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from uptowngallery.loadtest import prepare, run_scenario
+
+STARTUP_TIMEOUT = 30
+
+
+class Command(BaseCommand):
+    """
+    Load test the browse, open modal, bid scenario and report
+    throughput and tail latency. By default it starts gunicorn
+    with each profile from gunicorn.conf.py in turn, against the
+    configured database (SQLite or PostgreSQL); with --url it
+    targets a server that is already running.
+    """
+
+    help = "Load test the site under each gunicorn profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profiles",
+            default="sync,gthread,uvicorn",
+            help="Comma-separated gunicorn profiles to compare.",
+        )
+        parser.add_argument(
+            "--url",
+            help="Test this running server instead of starting gunicorn.",
+        )
+        parser.add_argument(
+            "--users", type=int, default=10, help="Concurrent virtual users."
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="Scenario runs per virtual user.",
+        )
+        parser.add_argument(
+            "--auctions",
+            type=int,
+            default=20,
+            help="Active auctions to make sure exist before starting.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help=(
+                "Gunicorn workers (WEB_CONCURRENCY) per profile; "
+                "more than one needs EVENT_BROKER=redis."
+            ),
+        )
+        parser.add_argument("--port", type=int, default=8765)
+
+    def handle(self, *args, **options):
+        session_keys = prepare(options["users"], options["auctions"])
+        if options["url"]:
+            targets = [(options["url"], options["url"].rstrip("/"))]
+        else:
+            base_url = f"http://127.0.0.1:{options['port']}"
+            targets = [
+                (profile, base_url)
+                for profile in options["profiles"].split(",")
+            ]
+        for label, base_url in targets:
+            server = None if options["url"] else self.start(label, options)
+            try:
+                if server:
+                    self.wait_until_ready(base_url, server)
+                result = run_scenario(
+                    base_url, session_keys, options["iterations"]
+                )
+            finally:
+                if server:
+                    server.terminate()
+                    server.wait()
+            self.write_report(label, result)
+
+    def start(self, profile, options):
+        env = {
+            **os.environ,
+            "GUNICORN_PROFILE": profile,
+            "WEB_CONCURRENCY": str(options["workers"]),
+            "PORT": str(options["port"]),
+        }
+        return subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def wait_until_ready(self, base_url, server):
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError("gunicorn exited during startup")
+            try:
+                requests.get(f"{base_url}/artworks/", timeout=1)
+                return
+            except requests.RequestException:
+                time.sleep(0.2)
+        raise CommandError(f"{base_url} did not start within {STARTUP_TIMEOUT}s")
+
+    def write_report(self, label, result):
+        self.stdout.write(
+            f"{label}: {result['requests']} requests in {result['seconds']}s, "
+            f"{result['throughput']} req/s"
+        )
+        for step, stats in result["steps"].items():
+            self.stdout.write(
+                f"  {step:<8} {stats['requests']:>5} requests "
+                f"{stats['errors']:>4} errors  p50 {stats['p50_ms']}ms  "
+                f"p95 {stats['p95_ms']}ms  p99 {stats['p99_ms']}ms"
+            )
@@ -0,0 +1,53 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from uptowngallery.deletion import PURGE_BATCH_SIZE, purge_orphaned_images
+
+
+class Command(BaseCommand):
+    """
+    Destroy the Cloudinary assets of deleted artworks.
+    Runs until the queue is drained by default;
+    with --loop it keeps polling, which is how the
+    janitor process in the Procfile runs it.
+    """
+
+    help = "Delete orphaned Cloudinary images in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=PURGE_BATCH_SIZE,
+            help="Number of images deleted per Cloudinary API call (max 100).",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, polling every --interval seconds.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60,
+            help="Seconds to sleep between polls when looping.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = min(options["batch_size"], PURGE_BATCH_SIZE)
+        while True:
+            purged_total = failed_total = 0
+            while True:
+                purged, failed = purge_orphaned_images(batch_size=batch_size)
+                purged_total += purged
+                failed_total += failed
+                if purged + failed < batch_size:
+                    break
+            if purged_total or failed_total or not options["loop"]:
+                self.stdout.write(
+                    f"Purged {purged_total} images, {failed_total} failed."
+                )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
+            close_old_connections()
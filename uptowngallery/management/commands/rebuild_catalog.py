@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from uptowngallery.catalog import rebuild_catalog
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the catalogue read model (CatalogEntry) from the
+    artworks and their active auctions, e.g. after a bulk import
+    or a fixture load that bypassed the write paths.
+    """
+
+    help = "Rebuild the catalogue of artworks in active auctions."
+
+    def handle(self, *args, **options):
+        count = rebuild_catalog()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt the catalogue with {count} entries.")
+        )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from uptowngallery.search import get_search_backend
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the artwork full-text search index from scratch,
+    e.g. after a bulk import that bypassed the save signals.
+    """
+
+    help = "Rebuild the artwork full-text search index."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        backend.rebuild()
+        self.stdout.write(
+            f"Rebuilt search index with {type(backend).__name__}."
+        )
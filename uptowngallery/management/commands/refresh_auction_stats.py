@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from uptowngallery.auctions import refresh_auction_stats
+from uptowngallery.models import Auction
+
+
+class Command(BaseCommand):
+    """
+    Backfill or repair the denormalized bid columns on Auction
+    (current_price, high_bid, bid_count, last_bid_at)
+    from the Bids table.
+    Every auction is recomputed with one set-based UPDATE,
+    so the command is safe to re-run at any time.
+    """
+
+    help = "Recompute current price, high bid and bid count for auctions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--auction",
+            type=int,
+            action="append",
+            dest="auction_ids",
+            help="Only refresh the given auction id (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        auctions = Auction.objects.all()
+        if options["auction_ids"]:
+            auctions = auctions.filter(pk__in=options["auction_ids"])
+        with transaction.atomic():
+            updated = refresh_auction_stats(auctions)
+        self.stdout.write(
+            self.style.SUCCESS(f"Refreshed bid stats for {updated} auctions.")
+        )
@@ -0,0 +1,100 @@
+import os
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from uptowngallery.seeding import (
+    DEFAULT_CHUNK_SIZE,
+    SEED_PASSWORD,
+    seed_gallery,
+    username_prefix,
+)
+
+FIXTURE_MODELS = [
+    "auth.user",
+    "uptowngallery.userprofile",
+    "uptowngallery.artwork",
+    "uptowngallery.auction",
+    "uptowngallery.bids",
+]
+COMPRESSIONS = (".gz", ".bz2", ".xz", ".lzma", ".zip")
+
+
+class Command(BaseCommand):
+    """
+    Fill the database with a synthetic, production-sized catalogue
+    for load and performance testing (see uptowngallery.seeding).
+    The same --seed always generates the same data; a seed can only
+    be used once per database.
+    With --fixture the users, profiles, artworks, auctions and bids
+    in the database are also dumped to a fixture, which
+    `loaddata` followed by `rebuild_search_index` restores.
+    """
+
+    help = "Generate synthetic users, artworks, auctions and bids."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--artworks", type=int, default=10000)
+        parser.add_argument("--bids", type=int, default=100000)
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Random seed; also part of the generated usernames.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Rows per bulk INSERT.",
+        )
+        parser.add_argument(
+            "--fixture",
+            help="Also dump the data to this fixture file; the format "
+            "comes from its extension (e.g. bids.jsonl.gz).",
+        )
+
+    def handle(self, *args, **options):
+        if options["users"] < 2:
+            raise CommandError("At least 2 users are needed to bid.")
+        prefix = username_prefix(options["seed"])
+        if get_user_model().objects.filter(
+            username__startswith=prefix
+        ).exists():
+            raise CommandError(
+                f"Seed {options['seed']} was already used in this database."
+            )
+        result = seed_gallery(
+            users=options["users"],
+            artworks=options["artworks"],
+            bids=options["bids"],
+            seed=options["seed"],
+            chunk_size=options["chunk_size"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {result}. Users {prefix}0... "
+                f"log in with the password {SEED_PASSWORD!r}."
+            )
+        )
+        if options["fixture"]:
+            path = options["fixture"]
+            call_command(
+                "dumpdata",
+                *FIXTURE_MODELS,
+                format=fixture_format(path),
+                output=path,
+                verbosity=0,
+            )
+            self.stdout.write(f"Wrote fixture {path}.")
+
+
+def fixture_format(path):
+    """
+    The serialization format named by a fixture path's extension,
+    after any compression extension: json unless stated otherwise.
+    """
+    name, extension = os.path.splitext(path)
+    if extension in COMPRESSIONS:
+        name, extension = os.path.splitext(name)
+    return extension.lstrip(".") or "json"
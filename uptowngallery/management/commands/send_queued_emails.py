@@ -0,0 +1,54 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from uptowngallery.outbox import DEFAULT_BATCH_SIZE, deliver_queued_emails
+
+
+class Command(BaseCommand):
+    """
+    Deliver emails queued in the OutboundEmail outbox.
+    Runs until the queue is drained by default;
+    with --loop it keeps polling, which is how the
+    mailer process in the Procfile runs it.
+    """
+
+    help = "Send queued outbound emails in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of emails sent per mail server connection.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running, polling every --interval seconds.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to sleep between polls when looping.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent_total = failed_total = 0
+            while True:
+                sent, failed = deliver_queued_emails(
+                    batch_size=options["batch_size"]
+                )
+                sent_total += sent
+                failed_total += failed
+                if sent + failed < options["batch_size"]:
+                    break
+            if sent_total or failed_total or not options["loop"]:
+                self.stdout.write(
+                    f"Sent {sent_total} emails, {failed_total} failed."
+                )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
+            close_old_connections()
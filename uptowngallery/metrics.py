@@ -0,0 +1,504 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from django.conf import settings
+from django.core.signals import request_finished
+from django.dispatch import receiver
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "uptowngallery_"
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+FLUSH_SECONDS = 5
+# Where the counts of exited gunicorn workers are added up.
+EXITED_FILE = "exited.json"
+
+
+class _CounterValue:
+    __slots__ = ("value", "lock")
+
+    def __init__(self, lock):
+        self.value = 0.0
+        self.lock = lock
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def snapshot(self):
+        return self.value
+
+    def reset(self, lock):
+        self.value = 0.0
+        self.lock = lock
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "lock")
+
+    def __init__(self, lock, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.lock = lock
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def snapshot(self):
+        with self.lock:
+            return [list(self.counts), self.sum]
+
+    def reset(self, lock):
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.lock = lock
+
+
+class Metric:
+    """
+    A named metric, optionally split by labels.
+    Call labels(*values) once and keep the child around on hot
+    paths: updating a child is a lock and an addition.
+    """
+
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=(), registry=None):
+        self.name = PREFIX + name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.children = {}
+        if not self.labelnames:
+            self.unlabelled = self.labels()
+        (registry or REGISTRY).register(self)
+
+    def labels(self, *values):
+        key = tuple(str(value) for value in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} takes labels {self.labelnames}, got {key}"
+            )
+        child = self.children.get(key)
+        if child is None:
+            with self.lock:
+                child = self.children.setdefault(key, self.new_value())
+        return child
+
+    def new_value(self):
+        raise NotImplementedError
+
+    def samples(self):
+        return [
+            [list(key), child.snapshot()]
+            for key, child in list(self.children.items())
+        ]
+
+    def reset(self):
+        """
+        Zero every child in place, so references kept by callers
+        stay valid, with a new lock in case the old one was held
+        when the process forked.
+        """
+        self.lock = threading.Lock()
+        for child in self.children.values():
+            child.reset(self.lock)
+
+
+class Counter(Metric):
+    """
+    A value that only goes up, e.g. bids placed.
+    """
+
+    kind = "counter"
+
+    def new_value(self):
+        return _CounterValue(self.lock)
+
+    def inc(self, amount=1):
+        self.unlabelled.inc(amount)
+
+
+class Histogram(Metric):
+    """
+    Observations counted into cumulative buckets, e.g. latencies
+    in seconds, from which Prometheus derives quantiles.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name,
+        help_text,
+        labelnames=(),
+        buckets=DEFAULT_BUCKETS,
+        registry=None,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, labelnames, registry)
+
+    def new_value(self):
+        return _HistogramValue(self.lock, self.buckets)
+
+    def observe(self, value):
+        self.unlabelled.observe(value)
+
+    def time(self):
+        return _Timer(self.unlabelled)
+
+
+class _Timer:
+    def __init__(self, value):
+        self.value = value
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.value.observe(time.perf_counter() - self.started)
+
+
+class Registry:
+    """
+    The metrics of this process, plus collectors that compute
+    gauges from shared state (the database, the cache) when
+    /metrics is scraped.
+
+    Under gunicorn every worker counts its own requests. With
+    METRICS_DIR set, each process writes its counters and
+    histograms to METRICS_DIR/<pid>.json (at most every
+    FLUSH_SECONDS, after a request) and a scrape adds up all the
+    files, so any worker can answer for the whole dyno. When a
+    worker exits, its counts still belong to the totals: the
+    gunicorn master folds its file into METRICS_DIR/exited.json
+    (see fold_exited_worker), so recycled workers do not leave a
+    file each behind. The directory should start empty whenever
+    the server does.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+        self.last_flush = 0.0
+
+    def register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+
+    def collector(self, function):
+        """
+        Register a function returning (name, kind, help, samples)
+        tuples, where samples is a list of (labels dict, value).
+        Usable as a decorator.
+        """
+        self.collectors.append(function)
+        return function
+
+    def snapshot(self):
+        return {
+            name: {
+                "kind": metric.kind,
+                "help": metric.help_text,
+                "labelnames": list(metric.labelnames),
+                "buckets": list(getattr(metric, "buckets", [])),
+                "samples": metric.samples(),
+            }
+            for name, metric in self.metrics.items()
+        }
+
+    def flush(self, directory=None):
+        """
+        Write this process's snapshot to the metrics directory.
+        """
+        directory = directory or settings.METRICS_DIR
+        if not directory:
+            return
+        self.last_flush = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(temporary, path)
+
+    def gather(self, directory=None):
+        """
+        The counters and histograms of every process sharing the
+        metrics directory (or just this one), added up.
+        """
+        directory = directory or settings.METRICS_DIR
+        if not directory:
+            return self.snapshot()
+        self.flush(directory)
+        return _merge_snapshots(
+            _read_snapshot(os.path.join(directory, filename))
+            for filename in sorted(os.listdir(directory))
+            if filename.endswith(".json")
+        )
+
+    def exposition(self, directory=None):
+        """
+        Every metric in the Prometheus text format.
+        """
+        lines = []
+        for name, family in self.gather(directory).items():
+            lines.extend(_family_lines(name, family))
+        for collector in self.collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                logger.error(f"Metrics collector {collector.__name__}: {e}")
+                continue
+            for name, kind, help_text, samples in families:
+                lines.append(f"# HELP {PREFIX}{name} {help_text}")
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+                for labels, value in samples:
+                    lines.append(
+                        f"{PREFIX}{name}{_labels(labels)} {_number(value)}"
+                    )
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        for metric in self.metrics.values():
+            metric.reset()
+
+
+def fold_exited_worker(directory, pid):
+    """
+    Add the counts of an exited worker to EXITED_FILE in the metrics
+    directory and delete the worker's own file. Called by the gunicorn
+    master, one worker at a time, from its child_exit hook.
+    """
+    path = os.path.join(directory, f"{pid}.json")
+    if not os.path.exists(path):
+        return
+    exited = os.path.join(directory, EXITED_FILE)
+    merged = _merge_snapshots(
+        _read_snapshot(source)
+        for source in (exited, path)
+        if os.path.exists(source)
+    )
+    temporary = f"{exited}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(merged, f)
+    os.replace(temporary, exited)
+    os.remove(path)
+
+
+def _read_snapshot(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Skipping metrics file {path}: {e}")
+        return {}
+
+
+def _merge_snapshots(snapshots):
+    merged = {}
+    for snapshot in snapshots:
+        for name, family in snapshot.items():
+            into = merged.setdefault(name, {**family, "samples": []})
+            _merge(into, family)
+    return merged
+
+
+def _merge(into, family):
+    totals = {tuple(labels): value for labels, value in into["samples"]}
+    for labels, value in family["samples"]:
+        key = tuple(labels)
+        current = totals.get(key)
+        if current is None:
+            totals[key] = value
+        elif family["kind"] == "histogram":
+            counts = [a + b for a, b in zip(current[0], value[0])]
+            totals[key] = [counts, current[1] + value[1]]
+        else:
+            totals[key] = current + value
+    into["samples"] = [[list(key), value] for key, value in totals.items()]
+
+
+def _family_lines(name, family):
+    lines = [
+        f"# HELP {name} {family['help']}",
+        f"# TYPE {name} {family['kind']}",
+    ]
+    labelnames = family["labelnames"]
+    for values, value in sorted(family["samples"]):
+        labels = dict(zip(labelnames, values))
+        if family["kind"] != "histogram":
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+            continue
+        counts, total = value
+        cumulative = 0
+        bounds = family["buckets"] + [math.inf]
+        for bound, count in zip(bounds, counts):
+            cumulative += count
+            le = "+Inf" if bound == math.inf else _number(bound)
+            lines.append(
+                f"{name}_bucket{_labels({**labels, 'le': le})} {cumulative}"
+            )
+        lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+        lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+    return lines
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            key,
+            str(value)
+            .replace("\\", "\\\\")
+            .replace('"', '\\"')
+            .replace("\n", "\\n"),
+        )
+        for key, value in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+REGISTRY = Registry()
+
+
+@receiver(request_finished)
+def flush_after_request(sender, **kwargs):
+    """
+    Signal receiver to write this worker's metrics to METRICS_DIR
+    now and then, so scrapes served by other workers include them.
+    """
+    if time.monotonic() - REGISTRY.last_flush >= FLUSH_SECONDS:
+        try:
+            REGISTRY.flush()
+        except OSError as e:
+            logger.error(f"Error writing metrics: {e}")
+
+
+# A forked worker starts from zero: the parent's counts are its own.
+os.register_at_fork(after_in_child=REGISTRY.reset)
+
+
+BIDS = Counter(
+    "bids_total",
+    "Bids submitted on auction pages, by outcome.",
+    ["outcome"],
+)
+BIDS_ACCEPTED = BIDS.labels("accepted")
+BIDS_REJECTED = BIDS.labels("rejected")
+BIDS_INVALID = BIDS.labels("invalid")
+BID_SECONDS = Histogram(
+    "bid_seconds",
+    "Time taken to place an accepted or rejected bid.",
+)
+APPROVAL_TRANSITIONS = Counter(
+    "artwork_approval_transitions_total",
+    "Artwork approval status changes saved through the ORM.",
+    ["previous", "current"],
+)
+ADMIN_ACTIONS = Counter(
+    "admin_actions_total",
+    "Objects handled by admin actions, by action.",
+    ["action"],
+)
+DB_CONNECT_SECONDS = Histogram(
+    "db_connect_seconds",
+    "Time taken to open a database connection.",
+    ["alias"],
+)
+
+
+@REGISTRY.collector
+def auction_metrics():
+    """
+    Active auctions, and how long the oldest expired auction has
+    been waiting for the closer (0 when it is keeping up).
+    """
+    from django.db.models import Min
+    from .models import Auction
+
+    now = timezone.now()
+    active = Auction.objects.filter(status="active")
+    oldest_expired = active.filter(end_date__lte=now).aggregate(
+        oldest=Min("end_date")
+    )["oldest"]
+    lag = (now - oldest_expired).total_seconds() if oldest_expired else 0.0
+    return [
+        (
+            "auctions_active",
+            "gauge",
+            "Auctions currently open for bids.",
+            [({}, active.count())],
+        ),
+        (
+            "auction_closing_lag_seconds",
+            "gauge",
+            "Age of the oldest expired auction that is still open.",
+            [({}, lag)],
+        ),
+    ]
+
+
+@REGISTRY.collector
+def outbox_metrics():
+    """
+    Queued emails by status; pending is the delivery backlog.
+    """
+    from django.db.models import Count
+    from .models import OutboundEmail
+
+    counts = dict.fromkeys(("pending", "sent", "failed"), 0)
+    for row in OutboundEmail.objects.values("status").annotate(n=Count("id")):
+        counts[row["status"]] = row["n"]
+    return [
+        (
+            "outbox_emails",
+            "gauge",
+            "Emails in the outbox, by status.",
+            [({"status": status}, n) for status, n in counts.items()],
+        ),
+    ]
+
+
+@REGISTRY.collector
+def fragment_cache_metrics():
+    """
+    The page fragment cache counters (see cache.cache_stats),
+    which already live in the shared cache.
+    """
+    from .cache import cache_stats
+
+    stats = cache_stats()
+    return [
+        (
+            f"fragment_cache_{outcome}_total",
+            "counter",
+            f"Page fragment cache {outcome}, by fragment.",
+            [
+                ({"fragment": name}, counts[outcome])
+                for name, counts in stats.items()
+            ],
+        )
+        for outcome in ("hits", "misses")
+    ]
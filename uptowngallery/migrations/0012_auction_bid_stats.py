@@ -0,0 +1,34 @@
+# Generated by Django 4.2 on 2026-10-18 08:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uptowngallery', '0011_alter_artwork_auction_duration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auction',
+            name='bid_count',
+            field=models.PositiveIntegerField(default=0, help_text='The number of bids placed on the auction.', verbose_name='Bid Count'),
+        ),
+        migrations.AddField(
+            model_name='auction',
+            name='current_price',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='The highest bid placed so far, empty until the first bid.', max_digits=10, null=True, verbose_name='Current Price'),
+        ),
+        migrations.AddField(
+            model_name='auction',
+            name='high_bid',
+            field=models.ForeignKey(blank=True, help_text='The bid currently holding the highest amount.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='uptowngallery.bids', verbose_name='High Bid'),
+        ),
+        migrations.AddField(
+            model_name='auction',
+            name='last_bid_at',
+            field=models.DateTimeField(blank=True, help_text='The date and time of the most recent bid.', null=True, verbose_name='Last Bid At'),
+        ),
+    ]
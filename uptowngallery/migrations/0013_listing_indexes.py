@@ -0,0 +1,37 @@
+# Generated by Django 4.2 on 2026-10-18 08:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uptowngallery', '0012_auction_bid_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='artwork',
+            index=models.Index(fields=['approval_status', 'category', '-create_date'], name='artwork_listing_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='artwork',
+            index=models.Index(condition=models.Q(('approved', False)), fields=['artist', '-create_date'], name='artwork_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(fields=['status', 'end_date'], name='auction_status_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(fields=['artwork', 'status'], name='auction_artwork_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['end_date'], name='auction_active_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bids',
+            index=models.Index(fields=['auction', '-amount'], name='bid_auction_amount_idx'),
+        ),
+    ]
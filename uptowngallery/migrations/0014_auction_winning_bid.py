@@ -0,0 +1,24 @@
+# Generated by Django 4.2 on 2026-10-18 08:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uptowngallery', '0013_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auction',
+            name='closed_at',
+            field=models.DateTimeField(blank=True, help_text='The date and time when the auction was closed.', null=True, verbose_name='Closed At'),
+        ),
+        migrations.AddField(
+            model_name='auction',
+            name='winning_bid',
+            field=models.ForeignKey(blank=True, help_text='The high bid at the moment the auction closed.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='uptowngallery.bids', verbose_name='Winning Bid'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 4.2 on 2026-10-18 08:51
+
+from django.db import migrations
+import uptowngallery.models
+
+
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX artwork_search_document_idx
+    ON uptowngallery_artwork USING GIN (search_document)
+    """,
+    """
+    UPDATE uptowngallery_artwork AS artwork SET search_document =
+        setweight(to_tsvector('english', coalesce(artwork.title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce((
+            SELECT profile.name FROM uptowngallery_userprofile AS profile
+            WHERE profile.id = artwork.artist_id
+        ), '')), 'B')
+        || setweight(to_tsvector('english', coalesce(artwork.category, '')), 'B')
+        || setweight(to_tsvector('english', coalesce(artwork.description, '')), 'C')
+    """,
+]
+POSTGRES_REVERSE = ["DROP INDEX IF EXISTS artwork_search_document_idx"]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE uptowngallery_artwork_fts USING fts5(
+        title, artist, description, category,
+        tokenize = 'porter unicode61', prefix = '2 3'
+    )
+    """,
+    """
+    INSERT INTO uptowngallery_artwork_fts
+        (rowid, title, artist, description, category)
+    SELECT artwork.id, coalesce(artwork.title, ''),
+        coalesce(profile.name, ''), coalesce(artwork.description, ''),
+        artwork.category
+    FROM uptowngallery_artwork AS artwork
+    LEFT JOIN uptowngallery_userprofile AS profile
+        ON profile.id = artwork.artist_id
+    """,
+]
+SQLITE_REVERSE = ["DROP TABLE IF EXISTS uptowngallery_artwork_fts"]
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        vendor_statements = statements.get(schema_editor.connection.vendor, [])
+        for statement in vendor_statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uptowngallery', '0015_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artwork',
+            name='search_document',
+            field=uptowngallery.models.SearchDocumentField(blank=True, editable=False, help_text='Maintained by uptowngallery.search on save.', null=True, verbose_name='Search Document'),
+        ),
+        migrations.RunPython(
+            run_vendor_sql(
+                {"postgresql": POSTGRES_FORWARD, "sqlite": SQLITE_FORWARD}
+            ),
+            run_vendor_sql(
+                {"postgresql": POSTGRES_REVERSE, "sqlite": SQLITE_REVERSE}
+            ),
+        ),
+    ]
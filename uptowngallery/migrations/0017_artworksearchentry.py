@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-18 08:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Make FTS5's rank column score with the same weights as PostgreSQL:
+# title, artist, description, category.
+SQLITE_RANK = """
+    INSERT INTO uptowngallery_artwork_fts (uptowngallery_artwork_fts, rank)
+    VALUES ('rank', 'bm25(10.0, 5.0, 1.0, 5.0)')
+"""
+
+
+def configure_rank(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(SQLITE_RANK)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uptowngallery', '0016_artwork_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtworkSearchEntry',
+            fields=[
+                ('artwork', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='uptowngallery.artwork')),
+                ('document', models.TextField(db_column='uptowngallery_artwork_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'uptowngallery_artwork_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(configure_rank, migrations.RunPython.noop),
+    ]
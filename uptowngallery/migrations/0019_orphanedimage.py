@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-18 09:08
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uptowngallery', '0018_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrphanedImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('public_id', models.CharField(max_length=255, unique=True, verbose_name='Public ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('failed', 'Failed')], default='pending', max_length=20, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, help_text='The asset is not retried before this time.', verbose_name='Next Attempt At')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last Error')),
+                ('create_date', models.DateTimeField(default=django.utils.timezone.now, help_text='The date when the asset was queued for deletion.', verbose_name='Create Date')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='orphanedimage',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['next_attempt_at'], name='orphaned_image_due_idx'),
+        ),
+    ]
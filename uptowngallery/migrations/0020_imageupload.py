@@ -0,0 +1,41 @@
+# Generated by Django 4.2 on 2026-10-18 09:15
+
+import cloudinary.models
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uptowngallery', '0019_orphanedimage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='artwork',
+            name='image',
+            field=cloudinary.models.CloudinaryField(help_text='Empty until the ingest_images worker has uploaded it.', max_length=255, null=True, verbose_name='Image'),
+        ),
+        migrations.CreateModel(
+            name='ImageUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('staged_name', models.CharField(help_text="The file's name in the image staging storage.", max_length=255, verbose_name='Staged Name')),
+                ('content_hash', models.CharField(db_index=True, help_text='SHA-256 of the image, used to upload each image once.', max_length=64, verbose_name='Content Hash')),
+                ('public_id', models.CharField(blank=True, max_length=255, verbose_name='Public ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('uploaded', 'Uploaded'), ('failed', 'Failed')], default='pending', max_length=20, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, help_text='The upload is not attempted before this time.', verbose_name='Next Attempt At')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last Error')),
+                ('create_date', models.DateTimeField(default=django.utils.timezone.now, help_text='The date when the image was staged.', verbose_name='Create Date')),
+                ('uploaded_at', models.DateTimeField(blank=True, null=True, verbose_name='Uploaded At')),
+                ('artwork', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='image_uploads', to='uptowngallery.artwork', verbose_name='Artwork')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='imageupload',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['next_attempt_at'], name='image_upload_due_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2 on 2026-10-18 09:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# The same rows as uptowngallery.catalog.rebuild_catalog.
+POPULATE = """
+INSERT INTO uptowngallery_catalogentry
+    (artwork_id, auction_id, title, category, artist_name, image,
+    current_price, end_date, create_date)
+SELECT artwork.id, auction.id, artwork.title, artwork.category,
+    profile.name, artwork.image,
+    coalesce(auction.current_price, auction.reserve_price),
+    auction.end_date, artwork.create_date
+FROM uptowngallery_auction AS auction
+JOIN uptowngallery_artwork AS artwork ON artwork.id = auction.artwork_id
+LEFT JOIN uptowngallery_userprofile AS profile
+    ON profile.id = artwork.artist_id
+WHERE artwork.approval_status = 'approved' AND auction.id IN (
+    SELECT max(id) FROM uptowngallery_auction
+    WHERE status = 'active' GROUP BY artwork_id
+)
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uptowngallery', '0020_imageupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogEntry',
+            fields=[
+                ('artwork', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='catalog_entry', serialize=False, to='uptowngallery.artwork', verbose_name='Artwork')),
+                ('title', models.CharField(max_length=255, null=True, verbose_name='Title')),
+                ('category', models.CharField(blank=True, choices=[('painting', 'Painting'), ('sculpture', 'Sculpture'), ('photography', 'Photography'), ('posters', 'Posters'), ('portraits', 'Portraits'), ('contemporary', 'Contemporary'), ('abstract', 'Abstract'), ('popart', 'Popart'), ('classical', 'Classical')], max_length=20, verbose_name='Category')),
+                ('artist_name', models.CharField(max_length=255, null=True, verbose_name='Artist Name')),
+                ('image', models.CharField(help_text='The Cloudinary public id of the artwork image.', max_length=255, null=True, verbose_name='Image')),
+                ('current_price', models.DecimalField(decimal_places=2, help_text='The highest bid, or the reserve price before the first.', max_digits=10, null=True, verbose_name='Current Price')),
+                ('end_date', models.DateTimeField(null=True, verbose_name='End Date')),
+                ('create_date', models.DateTimeField(help_text="The artwork's create date, which the catalogue is sorted by.", verbose_name='Create Date')),
+                ('auction', models.OneToOneField(help_text="The artwork's most recent active auction.", on_delete=django.db.models.deletion.CASCADE, related_name='catalog_entry', to='uptowngallery.auction', verbose_name='Auction')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='catalogentry',
+            index=models.Index(fields=['category', '-create_date', '-artwork'], name='catalog_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogentry',
+            index=models.Index(fields=['-create_date', '-artwork'], name='catalog_recent_idx'),
+        ),
+        migrations.RunSQL(POPULATE, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2 on 2026-10-18 10:37
+
+import os
+from django.conf import settings
+from django.db import migrations, models
+
+
+def load_staged_files(apps, schema_editor):
+    """
+    Move the pending images staged on this machine's disk into the
+    table. Uploads whose file is not here can never be read by the
+    ingest process, so they are marked failed.
+    """
+    ImageUpload = apps.get_model("uptowngallery", "ImageUpload")
+    root = os.environ.get(
+        "IMAGE_STAGING_ROOT", os.path.join(settings.BASE_DIR, "image_staging")
+    )
+    for upload in ImageUpload.objects.filter(status="pending").iterator():
+        try:
+            with open(os.path.join(root, upload.staged_name), "rb") as staged:
+                upload.data = staged.read()
+        except OSError as e:
+            upload.status = "failed"
+            upload.last_error = f"The staged file was lost: {e}"
+        upload.save(update_fields=["data", "status", "last_error"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uptowngallery', '0021_catalogentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageupload',
+            name='data',
+            field=models.BinaryField(help_text='The staged image, cleared once it is handled.', null=True, verbose_name='Data'),
+        ),
+        migrations.RunPython(load_staged_files, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='imageupload',
+            name='staged_name',
+        ),
+    ]
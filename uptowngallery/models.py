@@ -1,13 +1,25 @@
 from datetime import timedelta
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.db import models, transaction
+from django.db.models import Case, F, Max, Q, Value, When
 from django.utils import timezone
 from cloudinary.models import CloudinaryField
 
 
+class SearchDocumentField(models.TextField):
+    """
+    Holds an artwork's full-text search document:
+    a weighted tsvector on PostgreSQL and plain text elsewhere
+    (SQLite keeps its index in an FTS5 table instead).
+    """
+
+    def db_type(self, connection):
+        if connection.vendor == "postgresql":
+            return "tsvector"
+        return super().db_type(connection)
+
+
 class UserProfile(models.Model):
     """
     Represents a user profile,
@@ -70,6 +82,13 @@ class Artwork(models.Model):
         help_text="The date when the artwork was created.",
     )
 
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name="Updated At",
+        help_text="When the artwork last changed.",
+    )
+
     title = models.CharField(
         max_length=255,
         null=True,
@@ -80,7 +99,12 @@ class Artwork(models.Model):
     description = models.TextField(
         null=True, verbose_name="Description"
     )
-    image = CloudinaryField(null=False, blank=False, verbose_name="Image")
+    image = CloudinaryField(
+        null=True,
+        blank=False,
+        verbose_name="Image",
+        help_text="Empty until the ingest_images worker has uploaded it.",
+    )
 
     CATEGORY_CHOICES = [
         ("painting", "Painting"),
@@ -134,56 +158,114 @@ class Artwork(models.Model):
         help_text="The minimum price at which the artwork can be sold.",
     )
 
+    search_document = SearchDocumentField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Search Document",
+        help_text="Maintained by uptowngallery.search on save.",
+    )
+
     class Meta:
         ordering = ["-create_date"]
+        indexes = [
+            models.Index(
+                fields=["approval_status", "category", "-create_date"],
+                name="artwork_listing_idx",
+            ),
+            models.Index(
+                fields=["artist", "-create_date"],
+                condition=Q(approved=False),
+                name="artwork_pending_idx",
+            ),
+        ]
 
     def calculate_price(self):
         """
         Calculate the current price of the artwork based on the highest bid
         or the reserve price if there are no bids.
+        Reads the denormalized price kept on each auction
+        instead of loading the bids.
         """
-        related_auctions = self.auctions.all()
-        if related_auctions:
-            bids = Bids.objects.filter(auction__in=related_auctions)
-            if bids:
-                highest_bid = max(bids, key=lambda bid: bid.amount)
-                return highest_bid.amount
-            return self.reserve_price
+        highest_bid = self.auctions.aggregate(
+            highest=Max("current_price")
+        )["highest"]
+        if highest_bid is not None:
+            return highest_bid
         return self.reserve_price
 
     def __str__(self):
         return f"""Artwork #{self.id} -
         Title: {self.title} - Artist: {self.artist}"""
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the approval status as loaded,
+        so saves can tell whether it actually changed.
+        """
+        instance = super().from_db(db, field_names, values)
+        if "approval_status" in instance.__dict__:
+            instance._saved_approval_status = instance.approval_status
+        return instance
+
+    def approval_change(self, created=False):
+        """
+        Return the (previous, current) approval status since the
+        artwork was loaded or last saved, and mark the current one
+        as saved. previous is None for a new artwork; if the status
+        was never loaded it is assumed unchanged.
+        """
+        current = self.approval_status
+        if created:
+            previous = None
+        else:
+            previous = getattr(self, "_saved_approval_status", current)
+        self._saved_approval_status = current
+        return previous, current
+
+    def sync_auction(self, previous):
+        """
+        Move the artwork's auction along after its approval status
+        changed from `previous`: approval starts (or restarts) the
+        auction, withdrawing approval cancels the running one,
+        and any other change leaves auctions alone.
+        """
+        if self.approval_status == previous:
+            return
+        if self.approval_status == "approved":
+            self.approve_and_start_auction()
+        elif previous == "approved":
+            self.cancel_auction()
+
     def approve_and_start_auction(self):
         """
         Approve the artwork and start an auction.
         Create or update the auction details based on the start time and duration.
+        Reuses the artwork's latest auction if it has one,
+        so this is one read and one write.
         """
         auction_start = timezone.now()
-        auction_end = self.calculate_auction_end_date(auction_start) 
-
-        auction, created = Auction.objects.get_or_create(
-            artwork=self,
-            defaults={
-                "create_date": auction_start,
-                "end_date": auction_end,
-                "reserve_price": self.reserve_price,
-                "status": "active",
-                "is_active": True,
-                "duration": self.auction_duration,
-            },
+        auction = self.auctions.order_by("-id").first() or Auction(
+            artwork=self
         )
-
-        if not created:
-            # Update existing auction if necessary
-            auction.create_date = auction_start
-            auction.end_date = auction_end
-            auction.reserve_price = self.reserve_price
-            auction.status = "active"
-            auction.is_active = True
-            auction.duration = self.auction_duration
-            auction.save()
+        auction.create_date = auction_start
+        auction.end_date = self.calculate_auction_end_date(auction_start)
+        auction.reserve_price = self.reserve_price
+        auction.status = "active"
+        auction.is_active = True
+        auction.duration = self.auction_duration
+        auction.save()
+
+    def cancel_auction(self):
+        """
+        Cancel the artwork's running auction, if any.
+        """
+        auction = self.auctions.filter(status="active").order_by("-id").first()
+        if auction is not None:
+            auction.status = "cancelled"
+            auction.is_active = False
+            auction.save(update_fields=["status", "is_active", "updated_at"])
 
     def calculate_auction_end_date(self,auction_start):
         """
@@ -227,6 +309,13 @@ class Auction(models.Model):
         verbose_name="Create Date",
         help_text="The date when the auction was created.",
     )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name="Updated At",
+        help_text="When the auction last changed.",
+    )
     status = models.CharField(
         max_length=255,
         choices=STATUS_CHOICES,
@@ -250,21 +339,127 @@ class Auction(models.Model):
         help_text="The minimum price at which the artwork can be sold.",
     )
 
+    current_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name="Current Price",
+        help_text="The highest bid placed so far, empty until the first bid.",
+    )
+    high_bid = models.ForeignKey(
+        "Bids",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="High Bid",
+        help_text="The bid currently holding the highest amount.",
+    )
+    bid_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Bid Count",
+        help_text="The number of bids placed on the auction.",
+    )
+    last_bid_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Last Bid At",
+        help_text="The date and time of the most recent bid.",
+    )
+    winning_bid = models.ForeignKey(
+        "Bids",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="Winning Bid",
+        help_text="The high bid at the moment the auction closed.",
+    )
+    closed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Closed At",
+        help_text="The date and time when the auction was closed.",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "end_date"],
+                name="auction_status_end_idx",
+            ),
+            models.Index(
+                fields=["artwork", "status"],
+                name="auction_artwork_status_idx",
+            ),
+            models.Index(
+                fields=["end_date"],
+                condition=Q(status="active"),
+                name="auction_active_end_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"Auction #{self.id} - {self.status} - Artwork: {self.artwork}"
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
 
-    @receiver(post_save, sender=Artwork)
-    def artwork_approval_handler(sender, instance, created, **kwargs):
-        if created:
-            instance.approve_and_start_auction()
-        else:
-            if instance.approval_status == "approved":
-                instance.approve_and_start_auction()
-            elif instance.approval_status == "rejected":
-                pass
+    @property
+    def price(self):
+        """
+        The price shown to bidders:
+        the highest bid, or the reserve price if there are no bids.
+        """
+        if self.current_price is not None:
+            return self.current_price
+        return self.reserve_price
+
+    def apply_bid(self, bid, expected_count=None):
+        """
+        Fold a newly inserted bid into the denormalized
+        price and bid count columns with a single UPDATE.
+        The comparison runs in the database so concurrent
+        bids can never move the price backwards.
+        With `expected_count` the update only happens if the
+        bid count is unchanged (compare-and-swap).
+        The auction's catalogue row follows the new price.
+        Returns the number of rows updated.
+        """
+        outbid = Q(current_price__isnull=True) | Q(
+            current_price__lt=bid.amount
+        )
+        later = Q(last_bid_at__isnull=True) | Q(
+            last_bid_at__lt=bid.bid_time
+        )
+        auctions = Auction.objects.filter(pk=self.pk)
+        if expected_count is not None:
+            auctions = auctions.filter(bid_count=expected_count)
+        updated = auctions.update(
+            updated_at=timezone.now(),
+            bid_count=F("bid_count") + 1,
+            current_price=Case(
+                When(outbid, then=Value(bid.amount)),
+                default=F("current_price"),
+                output_field=models.DecimalField(),
+            ),
+            high_bid=Case(
+                When(outbid, then=Value(bid.pk)),
+                default=F("high_bid"),
+                output_field=models.IntegerField(),
+            ),
+            last_bid_at=Case(
+                When(later, then=Value(bid.bid_time)),
+                default=F("last_bid_at"),
+                output_field=models.DateTimeField(),
+            ),
+        )
+        if updated:
+            CatalogEntry.objects.filter(
+                auction_id=self.pk, current_price__lt=bid.amount
+            ).update(current_price=bid.amount)
+        return updated
 
 
 class Bids(models.Model):
@@ -299,6 +494,20 @@ class Bids(models.Model):
         help_text="The date and time when the bid was placed.",
     )
 
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Updated At",
+        help_text="When the bid last changed.",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["auction", "-amount"],
+                name="bid_auction_amount_idx",
+            ),
+        ]
+
     def clean(self):
         if self.amount is not None:
             if self.amount < 0:
@@ -307,3 +516,303 @@ class Bids(models.Model):
                 )
         else:
             raise ValidationError("Amount is required.")
+
+    def save(self, *args, apply_to_auction=True, **kwargs):
+        """
+        Save the bid and, for new bids, update the auction's
+        denormalized price columns in the same transaction.
+        Pass apply_to_auction=False when the caller updates
+        the auction itself (see uptowngallery.bidding).
+        """
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding and apply_to_auction:
+                self.auction.apply_bid(self)
+
+
+class OutboundEmail(models.Model):
+    """
+    Represents an email waiting in the outbox.
+    Signal receivers enqueue rows here instead of talking to
+    the mail server; the send_queued_emails worker delivers them
+    in batches and retries failures with backoff.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    ]
+
+    subject = models.CharField(max_length=255, verbose_name="Subject")
+    body = models.TextField(verbose_name="Body")
+    from_email = models.CharField(
+        max_length=255, verbose_name="From Email"
+    )
+    recipients = models.JSONField(
+        default=list,
+        verbose_name="Recipients",
+        help_text="List of recipient email addresses.",
+    )
+    dedup_key = models.CharField(
+        max_length=255,
+        unique=True,
+        null=True,
+        blank=True,
+        verbose_name="Dedup Key",
+        help_text="Emails sharing a dedup key are only queued once.",
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default="pending",
+        verbose_name="Status",
+    )
+    attempts = models.PositiveIntegerField(
+        default=0, verbose_name="Attempts"
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Next Attempt At",
+        help_text="The email is not retried before this time.",
+    )
+    last_error = models.TextField(blank=True, verbose_name="Last Error")
+    create_date = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Create Date",
+        help_text="The date when the email was queued.",
+    )
+    sent_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Sent At"
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=Q(status="pending"),
+                name="outbox_due_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Email #{self.id} - {self.status} - {self.subject}"
+
+
+class OrphanedImage(models.Model):
+    """
+    A Cloudinary asset whose artwork has been deleted,
+    waiting for the purge_images worker to destroy it.
+    Rows are removed once the asset is gone.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("failed", "Failed"),
+    ]
+
+    public_id = models.CharField(
+        max_length=255, unique=True, verbose_name="Public ID"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default="pending",
+        verbose_name="Status",
+    )
+    attempts = models.PositiveIntegerField(
+        default=0, verbose_name="Attempts"
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Next Attempt At",
+        help_text="The asset is not retried before this time.",
+    )
+    last_error = models.TextField(blank=True, verbose_name="Last Error")
+    create_date = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Create Date",
+        help_text="The date when the asset was queued for deletion.",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=Q(status="pending"),
+                name="orphaned_image_due_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Image {self.public_id} - {self.status}"
+
+
+class ImageUpload(models.Model):
+    """
+    An artwork image staged in the database by the create form,
+    waiting for the ingest_images worker to upload it and
+    write its public id back to the artwork.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("uploaded", "Uploaded"),
+        ("failed", "Failed"),
+    ]
+
+    artwork = models.ForeignKey(
+        Artwork,
+        on_delete=models.CASCADE,
+        related_name="image_uploads",
+        verbose_name="Artwork",
+    )
+    data = models.BinaryField(
+        null=True,
+        verbose_name="Data",
+        help_text="The staged image, cleared once it is handled.",
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        db_index=True,
+        verbose_name="Content Hash",
+        help_text="SHA-256 of the image, used to upload each image once.",
+    )
+    public_id = models.CharField(
+        max_length=255, blank=True, verbose_name="Public ID"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default="pending",
+        verbose_name="Status",
+    )
+    attempts = models.PositiveIntegerField(
+        default=0, verbose_name="Attempts"
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Next Attempt At",
+        help_text="The upload is not attempted before this time.",
+    )
+    last_error = models.TextField(blank=True, verbose_name="Last Error")
+    create_date = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Create Date",
+        help_text="The date when the image was staged.",
+    )
+    uploaded_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Uploaded At"
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=Q(status="pending"),
+                name="image_upload_due_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Upload for artwork {self.artwork_id} - {self.status}"
+
+
+class ArtworkSearchEntry(models.Model):
+    """
+    Read-only mapping of the SQLite FTS5 search table
+    (created by migration 0016), so searches can join it
+    instead of running one full-text lookup per artwork.
+    `document` is FTS5's hidden table-named column that
+    MATCH applies to, and `rank` its configured bm25 score.
+    Unused on PostgreSQL, where Artwork.search_document
+    holds the index.
+    """
+
+    artwork = models.OneToOneField(
+        Artwork,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="rowid",
+        db_constraint=False,
+        related_name="search_entry",
+    )
+    document = models.TextField(db_column="uptowngallery_artwork_fts")
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "uptowngallery_artwork_fts"
+
+
+class CatalogEntry(models.Model):
+    """
+    Read model of the live catalogue: one row per approved
+    artwork with an active auction, carrying everything the
+    listing, landing and search pages show, so they read a
+    single table instead of joining Artwork to Auction.
+    Kept in step by uptowngallery.catalog from the artwork,
+    auction and bid write paths; rebuild it with the
+    rebuild_catalog command after writes that bypass them.
+    """
+
+    artwork = models.OneToOneField(
+        Artwork,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="catalog_entry",
+        verbose_name="Artwork",
+    )
+    auction = models.OneToOneField(
+        Auction,
+        on_delete=models.CASCADE,
+        related_name="catalog_entry",
+        verbose_name="Auction",
+        help_text="The artwork's most recent active auction.",
+    )
+    title = models.CharField(
+        max_length=255, null=True, verbose_name="Title"
+    )
+    category = models.CharField(
+        max_length=20,
+        choices=Artwork.CATEGORY_CHOICES,
+        blank=True,
+        verbose_name="Category",
+    )
+    artist_name = models.CharField(
+        max_length=255, null=True, verbose_name="Artist Name"
+    )
+    image = models.CharField(
+        max_length=255,
+        null=True,
+        verbose_name="Image",
+        help_text="The Cloudinary public id of the artwork image.",
+    )
+    current_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        verbose_name="Current Price",
+        help_text="The highest bid, or the reserve price before the first.",
+    )
+    end_date = models.DateTimeField(null=True, verbose_name="End Date")
+    create_date = models.DateTimeField(
+        verbose_name="Create Date",
+        help_text="The artwork's create date, which the catalogue is sorted by.",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["category", "-create_date", "-artwork"],
+                name="catalog_category_idx",
+            ),
+            models.Index(
+                fields=["-create_date", "-artwork"],
+                name="catalog_recent_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Catalog entry for artwork #{self.artwork_id} - {self.title}"
@@ -0,0 +1,117 @@
+import logging
+from datetime import timedelta
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import OutboundEmail
+from .profiling import timed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+MAX_ATTEMPTS = 6
+RETRY_BASE_SECONDS = 30
+
+
+def enqueue_email(
+    subject, message, from_email, recipient_list, dedup_key=None
+):
+    """
+    Queue an email for the send_queued_emails worker.
+    Takes the same arguments as django.core.mail.send_mail,
+    plus an optional dedup key: a second email with the same
+    key is silently dropped.
+    """
+    enqueue_emails(
+        [
+            OutboundEmail(
+                subject=subject,
+                body=message,
+                from_email=from_email,
+                recipients=list(recipient_list),
+                dedup_key=dedup_key,
+            )
+        ]
+    )
+
+
+def enqueue_emails(emails):
+    """
+    Queue several unsaved OutboundEmail instances with one INSERT.
+    Rows whose dedup key is already queued are skipped.
+    """
+    emails = [email for email in emails if email.recipients]
+    if emails:
+        OutboundEmail.objects.bulk_create(emails, ignore_conflicts=True)
+
+
+def deliver_queued_emails(batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """
+    Send up to `batch_size` due emails over a single mail server
+    connection. Failed emails are retried with exponential backoff
+    and marked failed after MAX_ATTEMPTS.
+    Returns a (sent, failed) tuple of counts.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        due = OutboundEmail.objects.filter(
+            status="pending", next_attempt_at__lte=now
+        ).order_by("next_attempt_at", "id")
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        emails = list(due[:batch_size])
+        if not emails:
+            return 0, 0
+        sent_ids, failures = _send(emails)
+        OutboundEmail.objects.filter(id__in=sent_ids).update(
+            status="sent", sent_at=timezone.now()
+        )
+        for email, error in failures:
+            _schedule_retry(email, error, now)
+    if failures:
+        logger.warning(f"{len(failures)} queued emails failed to send")
+    return len(sent_ids), len(failures)
+
+
+def _send(emails):
+    sent_ids = []
+    failures = []
+    mail_connection = get_connection()
+    try:
+        with timed("smtp"):
+            mail_connection.open()
+    except Exception as e:
+        return sent_ids, [(email, e) for email in emails]
+    try:
+        for email in emails:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email,
+                to=email.recipients,
+                connection=mail_connection,
+            )
+            try:
+                with timed("smtp"):
+                    mail_connection.send_messages([message])
+            except Exception as e:
+                failures.append((email, e))
+            else:
+                sent_ids.append(email.id)
+    finally:
+        mail_connection.close()
+    return sent_ids, failures
+
+
+def _schedule_retry(email, error, now):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = "failed"
+        logger.error(f"Giving up on queued email {email.id}: {error}")
+    else:
+        delay = RETRY_BASE_SECONDS * 2 ** (email.attempts - 1)
+        email.next_attempt_at = now + timedelta(seconds=delay)
+    email.save(
+        update_fields=["attempts", "last_error", "status", "next_attempt_at"]
+    )
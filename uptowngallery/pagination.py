@@ -0,0 +1,226 @@
+import json
+from datetime import date
+from decimal import Decimal
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+
+CURSOR_SALT = "uptowngallery.pagination"
+DEFAULT_ORDERING = ("-create_date", "-id")
+
+
+class KeysetPaginator:
+    """
+    Cursor (seek) pagination over a queryset.
+    Rows are ordered by `ordering` (by default -create_date, -id;
+    the last field must be unique) and each page is fetched with a
+    WHERE (ordering) < (last seen) ... LIMIT query, so deep
+    pages cost the same as the first one and no COUNT(*) is issued.
+    Ordering fields may be annotations, e.g. a search rank.
+    Cursors are signed, opaque tokens.
+    With approximate_totals=True the page also carries the
+    planner's row estimate on PostgreSQL (None elsewhere).
+    """
+
+    def __init__(
+        self,
+        queryset,
+        per_page,
+        approximate_totals=False,
+        ordering=DEFAULT_ORDERING,
+    ):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.approximate_totals = approximate_totals
+        self.ordering = [
+            (field.lstrip("-"), field.startswith("-")) for field in ordering
+        ]
+
+    def get_page(self, cursor=None):
+        """
+        Return the page that the cursor points at,
+        or the first page for a missing or invalid cursor.
+        """
+        position = self.decode_cursor(cursor)
+        if position is None:
+            rows = self._fetch(None, backwards=False)
+            has_next = len(rows) > self.per_page
+            rows = rows[: self.per_page]
+            has_previous = False
+        elif position["backwards"]:
+            rows = self._fetch(position["values"], backwards=True)
+            has_previous = len(rows) > self.per_page
+            rows = list(reversed(rows[: self.per_page]))
+            has_next = True
+        else:
+            rows = self._fetch(position["values"], backwards=False)
+            has_next = len(rows) > self.per_page
+            rows = rows[: self.per_page]
+            has_previous = True
+        return KeysetPage(
+            self,
+            rows,
+            has_next=has_next and bool(rows),
+            has_previous=has_previous and bool(rows),
+            approximate_count=self._approximate_count(),
+        )
+
+    def _fetch(self, values, backwards):
+        return list(self.page_queryset(values, backwards)[: self.per_page + 1])
+
+    def page_queryset(self, values=None, backwards=False):
+        """
+        The ordered queryset a page is sliced from: every row
+        past the ordering values `values` (all rows for None).
+        """
+        order_by = []
+        for name, descending in self.ordering:
+            order_by.append(f"-{name}" if descending != backwards else name)
+        queryset = self.queryset.order_by(*order_by)
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, backwards))
+        return queryset
+
+    def _seek(self, values, backwards):
+        """
+        Build (a, b, c) > (x, y, z) as
+        a >= x AND (
+            a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        ),
+        with each comparison flipped for descending fields.
+        The redundant a >= x gives the database a range on the
+        leading column, so an index on it starts at the cursor
+        instead of scanning every earlier row. (Row-value
+        comparisons would too, but cannot mix directions.)
+        """
+        seek = Q(pk__in=[])
+        equal = Q()
+        for (name, descending), value in zip(self.ordering, values):
+            lookup = "lt" if descending != backwards else "gt"
+            seek |= equal & Q(**{f"{name}{LOOKUP_SEP}{lookup}": value})
+            equal &= Q(**{name: value})
+        (name, descending), value = self.ordering[0], values[0]
+        bound = "lte" if descending != backwards else "gte"
+        return Q(**{f"{name}{LOOKUP_SEP}{bound}": value}) & seek
+
+    def _approximate_count(self):
+        if not self.approximate_totals or connection.vendor != "postgresql":
+            return None
+        sql, params = self.queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]["Plan"]["Plan Rows"]
+
+    def encode_cursor(self, obj, backwards):
+        """
+        Build an opaque cursor pointing just past `obj`.
+        """
+        values = [
+            _json_value(getattr(obj, name)) for name, _ in self.ordering
+        ]
+        payload = json.dumps([values, int(backwards)])
+        return signing.dumps(payload, salt=CURSOR_SALT, compress=True)
+
+    def decode_cursor(self, cursor):
+        """
+        Decode a cursor into its position, or None if it is
+        missing, tampered with or malformed.
+        """
+        if not cursor:
+            return None
+        try:
+            values, backwards = json.loads(
+                signing.loads(cursor, salt=CURSOR_SALT)
+            )
+            if len(values) != len(self.ordering):
+                return None
+            values = [
+                self._output_field(name).to_python(value)
+                for (name, _), value in zip(self.ordering, values)
+            ]
+        except (
+            signing.BadSignature,
+            ValidationError,
+            TypeError,
+            ValueError,
+        ):
+            return None
+        if any(value is None for value in values):
+            return None
+        return {"values": values, "backwards": bool(backwards)}
+
+    def _output_field(self, name):
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.queryset.model._meta.get_field(name)
+
+
+class KeysetPage:
+    """
+    One page of a KeysetPaginator. Behaves like a list of objects
+    and exposes has_next/has_previous and the cursors to reach
+    the neighbouring pages.
+    """
+
+    cursor_mode = True
+
+    def __init__(
+        self, paginator, object_list, has_next, has_previous, approximate_count
+    ):
+        self.paginator = paginator
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.approximate_count = approximate_count
+
+    def __repr__(self):
+        return f"<KeysetPage of {len(self.object_list)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.encode_cursor(
+            self.object_list[-1], backwards=False
+        )
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return self.paginator.encode_cursor(
+            self.object_list[0], backwards=True
+        )
+
+
+def _json_value(value):
+    """
+    Convert an ordering value to JSON without losing precision
+    (DjangoJSONEncoder truncates microseconds).
+    """
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
@@ -0,0 +1,211 @@
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    """
+    Time spent per category (db, template, cloudinary, smtp...)
+    while handling one request, with a call count for each.
+    Nested calls of the same category are counted once,
+    e.g. a template rendered from inside another template.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings = {}
+        self.depth = {}
+
+    @contextmanager
+    def timed(self, category):
+        depth = self.depth.get(category, 0)
+        self.depth[category] = depth + 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.depth[category] = depth
+            if depth == 0:
+                self.add(category, time.perf_counter() - started)
+
+    def add(self, category, seconds):
+        count, total = self.timings.get(category, (0, 0.0))
+        self.timings[category] = (count + 1, total + seconds)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """
+        The profile as a Server-Timing header value.
+        """
+        entries = [
+            f'{category};dur={total * 1000:.1f};desc="{count} calls"'
+            for category, (count, total) in self.timings.items()
+        ]
+        entries.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(entries)
+
+    def as_dict(self):
+        return {
+            "total_ms": round(self.elapsed() * 1000, 1),
+            **{
+                category: {"count": count, "ms": round(total * 1000, 1)}
+                for category, (count, total) in self.timings.items()
+            },
+        }
+
+
+def current_profile():
+    """
+    Return the profile of the request being handled, if it is sampled.
+    """
+    return _current.get()
+
+
+def timed(category):
+    """
+    Context manager timing a block into the current request's
+    profile under `category`; does nothing outside a sampled request.
+
+        with timed("cloudinary"):
+            cloudinary.uploader.upload(...)
+    """
+    profile = _current.get()
+    if profile is None:
+        return nullcontext()
+    return profile.timed(category)
+
+
+def _time_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    with profile.timed("db"):
+        return execute(sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs):
+    """
+    Add the query timer to a connection's execute wrappers.
+    It is installed once per connection and costs a context
+    variable lookup per query when the request is not sampled.
+    """
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+class ProfiledTemplate:
+    """
+    Wraps a template from ProfiledDjangoTemplates to time rendering.
+    """
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        with timed("template"):
+            return self.template.render(context, request)
+
+
+class ProfiledDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend, with rendering times
+    recorded in the request profile.
+    """
+
+    def from_string(self, template_code):
+        return ProfiledTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return ProfiledTemplate(super().get_template(template_name))
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a sample of requests (PROFILING_SAMPLE_RATE, 0 to 1):
+    database queries, template rendering and calls to Cloudinary
+    and SMTP. Each sampled request is logged as one JSON line on
+    the uptowngallery.profiling logger and, unless
+    PROFILING_SERVER_TIMING is off, its timings are returned in a
+    Server-Timing header that browser dev tools display.
+    Requests that are not sampled pay for one random() call.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        # Connections opened before this module was imported
+        # never sent connection_created to install_query_timer.
+        for connection in connections.all(initialized_only=True):
+            install_query_timer(sender=None, connection=connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.report(request, response, profile)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.report(request, response, profile)
+        return response
+
+    def sampled(self):
+        rate = settings.PROFILING_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    def report(self, request, response, profile):
+        if settings.PROFILING_SERVER_TIMING:
+            timing = profile.server_timing()
+            if response.has_header("Server-Timing"):
+                timing = f"{response['Server-Timing']}, {timing}"
+            response["Server-Timing"] = timing
+        match = request.resolver_match
+        logger.info(
+            json.dumps(
+                {
+                    "method": request.method,
+                    "path": request.path,
+                    "view": match.view_name if match else None,
+                    "status": response.status_code,
+                    **profile.as_dict(),
+                }
+            )
+        )
@@ -0,0 +1,213 @@
+import logging
+import os
+import re
+import time
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template.base import Node, TokenType
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar("query_watch", default=None)
+
+IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+WHITESPACE = re.compile(r"\s+")
+MAX_ORIGIN_LINES = 8
+# Wrappers around every query or render, not where it comes from.
+SKIPPED_FILES = {
+    __file__,
+    os.path.join(os.path.dirname(__file__), "profiling.py"),
+}
+
+
+class NPlusOneError(Exception):
+    """
+    Raised at the end of a watched block that ran the same query
+    shape NPLUSONE_THRESHOLD times or more, when NPLUSONE_RAISE is on.
+    """
+
+
+def fingerprint(sql):
+    """
+    The shape of a query: the SQL with literals and the length
+    of IN lists taken out, so that loading related rows one at a
+    time gives the same fingerprint every time.
+    """
+    sql = IN_LIST.sub("IN (...)", sql)
+    sql = LITERAL.sub("?", sql)
+    return WHITESPACE.sub(" ", sql).strip()
+
+
+def query_origin():
+    """
+    Where the running query comes from, innermost first:
+    the template tags and variables being rendered, and the
+    frames of project code (not Django or other libraries).
+    """
+    base_dir = str(settings.BASE_DIR)
+    lines = []
+    for frame, lineno in traceback.walk_stack(None):
+        node = frame.f_locals.get("self")
+        if isinstance(node, Node) and getattr(node, "origin", None):
+            token = node.token
+            contents = (
+                f"{{{{ {token.contents} }}}}"
+                if token.token_type == TokenType.VAR
+                else f"{{% {token.contents} %}}"
+            )
+            name = node.origin.name
+            if name.startswith(base_dir):
+                name = os.path.relpath(name, base_dir)
+            line = f"{name}:{token.lineno} {contents}"
+        else:
+            filename = frame.f_code.co_filename
+            if (
+                not filename.startswith(base_dir)
+                or "site-packages" in filename
+                or filename in SKIPPED_FILES
+            ):
+                continue
+            line = (
+                f"{os.path.relpath(filename, base_dir)}:{lineno}"
+                f" in {frame.f_code.co_name}"
+            )
+        if not lines or lines[-1] != line:
+            lines.append(line)
+        if len(lines) == MAX_ORIGIN_LINES:
+            break
+    return lines
+
+
+class QueryWatch:
+    """
+    Query fingerprints seen while handling one request (or any
+    block run under watch_queries), with the origin of the query
+    that reached the threshold for each repeated shape.
+    """
+
+    def __init__(self, label, threshold):
+        self.label = label
+        self.threshold = threshold
+        self.counts = {}
+        self.origins = {}
+
+    def record(self, sql):
+        shape = fingerprint(sql)
+        count = self.counts.get(shape, 0) + 1
+        self.counts[shape] = count
+        if count == self.threshold:
+            self.origins[shape] = query_origin()
+
+    def repeated(self):
+        """
+        (fingerprint, count, origin) for every shape run at
+        least `threshold` times, most frequent first.
+        """
+        return sorted(
+            (
+                (shape, count, self.origins[shape])
+                for shape, count in self.counts.items()
+                if count >= self.threshold
+            ),
+            key=lambda item: -item[1],
+        )
+
+    def report(self):
+        repeated = self.repeated()
+        if not repeated:
+            return
+        message = "\n".join(
+            f"Possible N+1 in {self.label}: {count} queries like {shape}\n"
+            + "".join(f"    {line}\n" for line in origin)
+            for shape, count, origin in repeated
+        )
+        if settings.NPLUSONE_RAISE:
+            raise NPlusOneError(message)
+        logger.warning(message)
+
+
+@contextmanager
+def watch_queries(label, threshold=None):
+    """
+    Watch the queries run inside the block and report repeated
+    shapes when it ends (see QueryWatch.report). Used by
+    QueryWatchMiddleware for requests; usable around commands
+    and tasks too, once the query watcher is installed.
+    """
+    watch = QueryWatch(label, threshold or settings.NPLUSONE_THRESHOLD)
+    token = _current.set(watch)
+    try:
+        yield watch
+    finally:
+        _current.reset(token)
+    watch.report()
+
+
+def _watch_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        seconds = time.perf_counter() - started
+        watch = _current.get()
+        if watch is not None:
+            watch.record(sql)
+        if seconds >= settings.SLOW_QUERY_SECONDS:
+            origin = "".join(f"\n    {line}" for line in query_origin())
+            logger.warning(
+                f"Slow query ({seconds * 1000:.1f} ms): {sql[:1000]}{origin}"
+            )
+
+
+@receiver(connection_created)
+def install_query_watcher(sender, connection, **kwargs):
+    """
+    Add the query watcher to a connection's execute wrappers
+    when QUERY_WATCH is on.
+    """
+    if not settings.QUERY_WATCH:
+        return
+    if _watch_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_watch_query)
+
+
+class QueryWatchMiddleware:
+    """
+    For development and staging (QUERY_WATCH): logs queries slower
+    than SLOW_QUERY_SECONDS, and flags query shapes that a request
+    runs NPLUSONE_THRESHOLD times or more, typically related objects
+    loaded one by one from a template loop, with the template and
+    view lines that ran them. With NPLUSONE_RAISE on (as in the test
+    suite) the request fails with NPlusOneError instead.
+    Not loaded at all when QUERY_WATCH is off.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.QUERY_WATCH:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        for connection in connections.all(initialized_only=True):
+            install_query_watcher(sender=None, connection=connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with watch_queries(f"{request.method} {request.path}"):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with watch_queries(f"{request.method} {request.path}"):
+            return await self.get_response(request)
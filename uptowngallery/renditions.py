@@ -0,0 +1,168 @@
+import io
+import logging
+from dataclasses import dataclass
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils.module_loading import import_string
+from .cache import cached_renditions
+
+logger = logging.getLogger(__name__)
+
+# Modern formats offered through <source> elements, best first;
+# browsers that support none of them get FALLBACK_FORMAT.
+FORMATS = ("avif", "webp")
+FALLBACK_FORMAT = "jpg"
+# Each rendition is offered at 1x and 2x its width.
+DENSITIES = (1, 2)
+
+
+@dataclass(frozen=True)
+class Rendition:
+    """
+    A named size an artwork image is shown at.
+    Without a height the image keeps its aspect ratio.
+    `sizes` is the <img sizes> hint for choosing a width.
+    """
+
+    name: str
+    width: int
+    height: int = None
+    sizes: str = "100vw"
+
+    def widths(self):
+        return [self.width * density for density in DENSITIES]
+
+    def height_for(self, width):
+        if self.height is None:
+            return None
+        return round(self.height * width / self.width)
+
+
+RENDITIONS = {
+    rendition.name: rendition
+    for rendition in (
+        Rendition("thumb", 240, 240, "240px"),
+        Rendition("card", 320, 200, "(min-width: 768px) 25vw, 100vw"),
+        Rendition("detail", 800, None, "(min-width: 768px) 50vw, 100vw"),
+    )
+}
+
+
+class CloudinaryRenderer:
+    """
+    Builds Cloudinary delivery URLs that resize and
+    re-encode on Cloudinary's side; nothing is rendered here.
+    """
+
+    def supports(self, image_format):
+        return True
+
+    def url(self, public_id, rendition, width, image_format):
+        import cloudinary
+
+        height = rendition.height_for(width)
+        return cloudinary.CloudinaryImage(public_id).build_url(
+            width=width,
+            height=height,
+            crop="fill" if height else "limit",
+            format=image_format,
+            quality="auto",
+            secure=True,
+        )
+
+
+class LocalRenderer:
+    """
+    Renders renditions with Pillow from the originals kept by
+    ingestion.LocalBackend, for working and testing offline.
+    Files are written under IMAGE_LOCAL_ROOT the first time they
+    are asked for and served from IMAGE_LOCAL_URL.
+    Requires the Pillow package.
+    """
+
+    PIL_FORMATS = {"avif": "AVIF", "webp": "WEBP", "jpg": "JPEG"}
+
+    def __init__(self):
+        self.storage = FileSystemStorage(
+            location=settings.IMAGE_LOCAL_ROOT,
+            base_url=settings.IMAGE_LOCAL_URL,
+        )
+
+    def supports(self, image_format):
+        from PIL import features
+
+        return image_format == FALLBACK_FORMAT or bool(
+            features.check(image_format)
+        )
+
+    def url(self, public_id, rendition, width, image_format):
+        name = f"renditions/{public_id}/{rendition.name}-{width}.{image_format}"
+        if not self.storage.exists(name):
+            self.render(public_id, name, rendition, width, image_format)
+        return self.storage.url(name)
+
+    def render(self, public_id, name, rendition, width, image_format):
+        from PIL import Image, ImageOps
+
+        with self.storage.open(public_id) as original:
+            image = ImageOps.exif_transpose(Image.open(original))
+            height = rendition.height_for(width)
+            if height:
+                image = ImageOps.fit(image, (width, height))
+            else:
+                image.thumbnail((width, width * 4))
+            if image_format == "jpg":
+                image = image.convert("RGB")
+            output = io.BytesIO()
+            image.save(output, self.PIL_FORMATS[image_format])
+        self.storage.save(name, ContentFile(output.getvalue()))
+
+
+def get_renderer():
+    """
+    Return the renderer named by settings.IMAGE_RENDERER.
+    """
+    return import_string(settings.IMAGE_RENDERER)()
+
+
+def rendition_set(artwork, name):
+    """
+    Return the URLs of an artwork image's rendition as a dict:
+    `src` (the fallback format at 1x), `srcset` per format,
+    plus the rendition's `width`, `height` and `sizes`.
+    Returns None if the artwork has no image yet.
+    Cached per artwork and image, so a changed image
+    gets new URLs (see cached_renditions).
+    """
+    if not artwork.image:
+        return None
+    rendition = RENDITIONS[name]
+    public_id = getattr(artwork.image, "public_id", artwork.image)
+    return cached_renditions(
+        artwork.pk,
+        public_id,
+        name,
+        lambda: _build_rendition_set(public_id, rendition),
+    )
+
+
+def _build_rendition_set(public_id, rendition):
+    renderer = get_renderer()
+    srcset = {}
+    for image_format in (*FORMATS, FALLBACK_FORMAT):
+        if not renderer.supports(image_format):
+            continue
+        srcset[image_format] = ", ".join(
+            f"{renderer.url(public_id, rendition, width, image_format)} {width}w"
+            for width in rendition.widths()
+        )
+    return {
+        "src": renderer.url(
+            public_id, rendition, rendition.width, FALLBACK_FORMAT
+        ),
+        "srcset": srcset,
+        "width": rendition.width,
+        "height": rendition.height,
+        "sizes": rendition.sizes,
+    }
@@ -0,0 +1,230 @@
+import re
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Lookup, OuterRef, Q, Subquery, Value
+from django.utils.module_loading import import_string
+from .models import Artwork, ArtworkSearchEntry, UserProfile
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MAX_TOKENS = 8
+
+
+def tokenize(query):
+    """
+    Split a user query into at most MAX_TOKENS lowercase words,
+    dropping any search-engine syntax.
+    """
+    return [token.lower() for token in TOKEN_RE.findall(query)][:MAX_TOKENS]
+
+
+class SearchBackend:
+    """
+    Interface for artwork full-text search.
+    `index` and `remove` keep the index in step with Artwork rows;
+    `search` narrows an Artwork queryset to matches for a query
+    and annotates it with a `rank` where lower is better,
+    so results can be ordered (and keyset-paginated) by rank.
+    `prefix` is the path from the queryset's model to Artwork,
+    e.g. "artwork__" to search CatalogEntry rows.
+    The last word of the query is matched as a prefix
+    for type-ahead.
+    """
+
+    def index(self, artwork_ids):
+        raise NotImplementedError
+
+    def remove(self, artwork_ids):
+        raise NotImplementedError
+
+    def rebuild(self):
+        """
+        Reindex every artwork.
+        """
+        self.index(Artwork.objects.values_list("id", flat=True))
+
+    def search(self, queryset, query, prefix=""):
+        raise NotImplementedError
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Stores a weighted tsvector in Artwork.search_document
+    (title A, artist and category B, description C),
+    indexed with GIN, and ranks with ts_rank.
+    """
+
+    config = "english"
+
+    def document(self):
+        from django.contrib.postgres.search import SearchVector
+
+        artist_name = UserProfile.objects.filter(
+            pk=OuterRef("artist_id")
+        ).values("name")[:1]
+        return (
+            SearchVector("title", weight="A", config=self.config)
+            + SearchVector(Subquery(artist_name), weight="B", config=self.config)
+            + SearchVector("category", weight="B", config=self.config)
+            + SearchVector("description", weight="C", config=self.config)
+        )
+
+    def index(self, artwork_ids):
+        Artwork.objects.filter(pk__in=list(artwork_ids)).update(
+            search_document=self.document()
+        )
+
+    def remove(self, artwork_ids):
+        # The document lives on the artwork row itself.
+        pass
+
+    def rebuild(self):
+        Artwork.objects.update(search_document=self.document())
+
+    def search(self, queryset, query, prefix=""):
+        from django.contrib.postgres.search import (
+            SearchQuery,
+            SearchRank,
+            SearchVectorExact,
+        )
+
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+        tokens[-1] += ":*"
+        search_query = SearchQuery(
+            " & ".join(tokens), search_type="raw", config=self.config
+        )
+        document = F(f"{prefix}search_document")
+        return queryset.filter(
+            SearchVectorExact(document, search_query)
+        ).annotate(rank=-SearchRank(document, search_query))
+
+
+class Match(Lookup):
+    """
+    SQLite FTS5 full-text match.
+    """
+
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
+ArtworkSearchEntry._meta.get_field("document").register_lookup(Match)
+
+
+class SqliteSearchBackend(SearchBackend):
+    """
+    Keeps an FTS5 table (uptowngallery_artwork_fts, keyed by the
+    artwork id) for local and test runs. Searches join it through
+    ArtworkSearchEntry and rank by its bm25 rank column, which
+    migration 0017 weights the same way as PostgreSQL.
+    """
+
+    table = ArtworkSearchEntry._meta.db_table
+
+    def index(self, artwork_ids):
+        artwork_ids = list(artwork_ids)
+        if not artwork_ids:
+            return
+        self.remove(artwork_ids)
+        placeholders = ", ".join(["%s"] * len(artwork_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {self.table}
+                    (rowid, title, artist, description, category)
+                SELECT artwork.id, coalesce(artwork.title, ''),
+                    coalesce(profile.name, ''),
+                    coalesce(artwork.description, ''), artwork.category
+                FROM uptowngallery_artwork AS artwork
+                LEFT JOIN uptowngallery_userprofile AS profile
+                    ON profile.id = artwork.artist_id
+                WHERE artwork.id IN ({placeholders})
+                """,
+                artwork_ids,
+            )
+
+    def remove(self, artwork_ids):
+        artwork_ids = list(artwork_ids)
+        if not artwork_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(artwork_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE rowid IN ({placeholders})",
+                artwork_ids,
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+        super().rebuild()
+
+    def search(self, queryset, query, prefix=""):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+        match = " ".join(f'"{token}"' for token in tokens[:-1])
+        match = f'{match} "{tokens[-1]}"*'.strip()
+        return queryset.filter(
+            **{f"{prefix}search_entry__document__match": match}
+        ).annotate(rank=F(f"{prefix}search_entry__rank"))
+
+
+class BasicSearchBackend(SearchBackend):
+    """
+    Fallback for databases without full-text support:
+    every word must appear in the title, artist name,
+    category or description. All matches rank equally.
+    """
+
+    def index(self, artwork_ids):
+        pass
+
+    def remove(self, artwork_ids):
+        pass
+
+    def search(self, queryset, query, prefix=""):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+        fields = ["title", "artist__name", "category", "description"]
+        for token in tokens:
+            matches = Q()
+            for field in fields:
+                matches |= Q(**{f"{prefix}{field}__icontains": token})
+            queryset = queryset.filter(matches)
+        return queryset.annotate(rank=Value(0.0))
+
+
+VENDOR_BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SqliteSearchBackend,
+}
+
+
+def get_search_backend():
+    """
+    Return the backend named by settings.SEARCH_BACKEND,
+    or the one matching the database vendor.
+    """
+    backend_path = getattr(settings, "SEARCH_BACKEND", None)
+    if backend_path:
+        return import_string(backend_path)()
+    return VENDOR_BACKENDS.get(connection.vendor, BasicSearchBackend)()
+
+
+def index_artworks(artwork_ids):
+    get_search_backend().index(artwork_ids)
+
+
+def remove_artworks(artwork_ids):
+    get_search_backend().remove(artwork_ids)
+
+
+def search_artworks(queryset, query, prefix=""):
+    return get_search_backend().search(queryset, query, prefix)
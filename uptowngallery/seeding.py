@@ -0,0 +1,243 @@
+import logging
+import random
+from dataclasses import dataclass
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .auctions import refresh_auction_stats
+from .catalog import rebuild_catalog
+from .models import Artwork, Auction, Bids, UserProfile
+from .search import get_search_backend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+SEED_PASSWORD = "seed-password"
+# Bids per auction follow Zipf's law: the auction ranked k gets a
+# share proportional to 1 / k ** POWER_LAW_EXPONENT.
+POWER_LAW_EXPONENT = 1.1
+RESERVE_PRICES = (50, 100, 250, 500, 1000)
+MAX_BID_INCREMENT = 25
+HISTORY_DAYS = 60
+BID_FIELDS = ("auction", "bidder", "amount", "bid_time", "updated_at")
+# Approval status, then auction status, with their weights.
+ARTWORK_STATES = [
+    (("approved", "active"), 50),
+    (("approved", "closed"), 35),
+    (("approved", "cancelled"), 3),
+    (("pending", "pending"), 7),
+    (("rejected", "cancelled"), 5),
+]
+
+
+@dataclass
+class SeedResult:
+    users: int = 0
+    artworks: int = 0
+    auctions: int = 0
+    bids: int = 0
+
+    def __str__(self):
+        return (
+            f"{self.users} users, {self.artworks} artworks, "
+            f"{self.auctions} auctions and {self.bids} bids"
+        )
+
+
+def username_prefix(seed):
+    return f"seed{seed}-"
+
+
+def seed_gallery(
+    users, artworks, bids, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, now=None
+):
+    """
+    Generate a synthetic catalogue with set-based inserts
+    (bulk_create, and plain multi-row INSERTs for the bids), which
+    send no post_save signals, so nothing is indexed, cached or
+    emailed row by row:
+    - `users` users with profiles, all with the password
+      SEED_PASSWORD and usernames starting with username_prefix(seed);
+    - `artworks` artworks across every category, in a realistic mix
+      of approval and auction states (see ARTWORK_STATES);
+    - `bids` bids over the active and closed auctions, a few hot
+      auctions taking most of them (see POWER_LAW_EXPONENT), with
+      rising amounts and times, inserted `chunk_size` at a time.
+    The denormalized auction columns, the catalogue and the
+    search index are rebuilt at the end. The same seed always gives the same data,
+    relative to `now`.
+    """
+    rng = random.Random(seed)
+    now = now or timezone.now()
+    profiles = _seed_users(users, seed, chunk_size)
+    auctions = _seed_catalogue(rng, profiles, artworks, chunk_size, now)
+    biddable = [a for a in auctions if a.status in ("active", "closed")]
+    total_bids = 0
+    chunk = []
+    for bid in _generate_bids(rng, profiles, biddable, bids, now):
+        chunk.append(bid)
+        if len(chunk) == chunk_size:
+            total_bids += _write_bids(chunk)
+            chunk = []
+            logger.info(f"Seeded {total_bids}/{bids} bids")
+    total_bids += _write_bids(chunk)
+    seeded = Auction.objects.filter(
+        artwork__artist__user__username__startswith=username_prefix(seed),
+        status__in=["active", "closed"],
+    )
+    with transaction.atomic():
+        refresh_auction_stats(seeded)
+        seeded.filter(status="closed").update(winning_bid=F("high_bid"))
+        rebuild_catalog()
+    get_search_backend().rebuild()
+    return SeedResult(len(profiles), artworks, len(auctions), total_bids)
+
+
+def _seed_users(count, seed, chunk_size):
+    prefix = username_prefix(seed)
+    password = make_password(SEED_PASSWORD)
+    users = get_user_model().objects.bulk_create(
+        (
+            get_user_model()(
+                username=f"{prefix}{i}",
+                email=f"{prefix}{i}@example.com",
+                password=password,
+            )
+            for i in range(count)
+        ),
+        batch_size=chunk_size,
+    )
+    return UserProfile.objects.bulk_create(
+        (
+            UserProfile(user=user, name=f"Seed User {i}")
+            for i, user in enumerate(users)
+        ),
+        batch_size=chunk_size,
+    )
+
+
+def _seed_catalogue(rng, profiles, count, chunk_size, now):
+    categories = [key for key, _ in Artwork.CATEGORY_CHOICES]
+    durations = [key for key, _ in Artwork.AUCTION_DURATION_CHOICES]
+    states, weights = zip(*ARTWORK_STATES)
+    plans = []
+    for _ in range(count):
+        approval, status = rng.choices(states, weights)[0]
+        duration = rng.choice(durations)
+        days = timedelta(days=int(duration))
+        history = timedelta(seconds=rng.uniform(0, HISTORY_DAYS * 86400))
+        if status == "active":
+            # Started recently enough to still be running.
+            created = now - days * rng.random()
+        elif status == "closed":
+            created = now - days - history
+        else:
+            created = now - history
+        plans.append((approval, status, duration, created, created + days))
+    artworks = Artwork.objects.bulk_create(
+        (
+            Artwork(
+                artist=rng.choice(profiles),
+                title=f"Seeded artwork {i}",
+                description=f"Synthetic {categories[i % len(categories)]}"
+                f" number {i}",
+                # Every category is covered, in equal shares.
+                category=categories[i % len(categories)],
+                reserve_price=rng.choice(RESERVE_PRICES),
+                auction_duration=duration,
+                approved=approval == "approved",
+                approval_status=approval,
+                auction_start=created if approval == "approved" else None,
+                create_date=created,
+            )
+            for i, (approval, _, duration, created, _) in enumerate(plans)
+        ),
+        batch_size=chunk_size,
+    )
+    return Auction.objects.bulk_create(
+        (
+            Auction(
+                artwork=artwork,
+                status=status,
+                is_active=status == "active",
+                reserve_price=int(artwork.reserve_price),
+                duration=duration,
+                create_date=created,
+                end_date=end_date,
+                closed_at=end_date if status == "closed" else None,
+            )
+            for artwork, (_, status, duration, created, end_date) in zip(
+                artworks, plans
+            )
+        ),
+        batch_size=chunk_size,
+    )
+
+
+def bid_counts(total, auctions, rng):
+    """
+    Split `total` bids over `auctions` following Zipf's law,
+    with the popularity ranks shuffled by `rng`.
+    Returns a list of (auction, count), dropping auctions with none.
+    """
+    ranked = list(auctions)
+    if not ranked:
+        return []
+    rng.shuffle(ranked)
+    weights = [
+        1 / rank**POWER_LAW_EXPONENT for rank in range(1, len(ranked) + 1)
+    ]
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    for i in range(total - sum(counts)):
+        counts[i % len(counts)] += 1
+    return [(a, n) for a, n in zip(ranked, counts) if n]
+
+
+def _generate_bids(rng, profiles, auctions, total, now):
+    """
+    Yield bid rows as tuples of BID_FIELDS values, ready for the
+    database, rising in amount and time within each auction.
+    """
+    adapt = connection.ops.adapt_datetimefield_value
+    for auction, count in bid_counts(total, auctions, rng):
+        start = auction.create_date
+        span = (min(auction.end_date, now) - start).total_seconds()
+        offsets = sorted(rng.uniform(0, span) for _ in range(count))
+        amount = auction.reserve_price
+        artist_id = auction.artwork.artist_id
+        for offset in offsets:
+            amount += rng.randint(1, MAX_BID_INCREMENT)
+            index = rng.randrange(len(profiles))
+            if profiles[index].pk == artist_id:
+                # Artists cannot bid on their own work.
+                index = (index + 1) % len(profiles)
+            bid_time = adapt(start + timedelta(seconds=offset))
+            yield (auction.pk, profiles[index].pk, amount, bid_time, bid_time)
+
+
+def _write_bids(rows):
+    """
+    Insert bid rows with multi-row INSERT statements. Building
+    Bids instances for bulk_create costs several times more
+    per row, which adds up at millions of bids.
+    """
+    if not rows:
+        return 0
+    fields = [Bids._meta.get_field(name) for name in BID_FIELDS]
+    table = connection.ops.quote_name(Bids._meta.db_table)
+    columns = ", ".join(connection.ops.quote_name(f.column) for f in fields)
+    row_sql = "(" + ", ".join(["%s"] * len(fields)) + ")"
+    per_statement = connection.ops.bulk_batch_size(fields, rows)
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(rows), per_statement):
+            batch = rows[start : start + per_statement]
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) VALUES "
+                + ", ".join([row_sql] * len(batch)),
+                [value for row in batch for value in row],
+            )
+    return len(rows)
@@ -1,16 +1,28 @@
 import logging
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
+from django.db import transaction
 from django.dispatch import receiver, Signal
 from allauth.account.signals import user_signed_up
-from uptowngallery.models import UserProfile, Artwork
+from uptowngallery.cache import invalidate_auction_state, invalidate_catalogue
+from uptowngallery.catalog import refresh_catalog, update_artist_name
+from uptowngallery.events import publish_event
+from uptowngallery.metrics import APPROVAL_TRANSITIONS
+from uptowngallery.models import (
+    UserProfile,
+    Artwork,
+    Auction,
+    Bids,
+    OutboundEmail,
+)
+from uptowngallery.outbox import enqueue_email, enqueue_emails
+from uptowngallery.search import index_artworks, remove_artworks
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
-artwork_approved = Signal()
-artwork_denied = Signal()
-auction_closed = Signal()
+artworks_approved = Signal()
+artworks_denied = Signal()
+auctions_closed = Signal()
 bid_placed = Signal()
 profile_updated = Signal()
 
@@ -37,13 +49,14 @@ def create_user_profile(sender, request, user, **kwargs):
 
 
 @receiver(post_save, sender=User)
-def update_user_profile(sender, instance, created, **kwargs):
+def update_user_profile(sender, instance, created, raw=False, **kwargs):
     """
     Signal receiver to update the UserProfile
     instance when the User instance is updated.
     Saves the profile and logs any exceptions.
+    Skipped for fixture loading (raw saves).
     """
-    if not created:
+    if not created and not raw:
         try:
             logger.info("User updated: Saving UserProfile")
             instance.profile.save()
@@ -52,102 +65,150 @@ def update_user_profile(sender, instance, created, **kwargs):
 
 
 @receiver(post_save, sender=Artwork)
-def update_or_create_auction(sender, instance, created, **kwargs):
+def sync_artwork_auction(
+    sender, instance, created, update_fields=None, raw=False, **kwargs
+):
     """
-    Signal receiver to handle the
-    post-save event for an Artwork instance.
-    If the artwork's approval status is 'approved',
-    it triggers the auction approval process.
+    Signal receiver to move the artwork's auction along
+    when its approval status actually changes.
+    Saves that leave the status alone write nothing;
+    the auction write runs once the transaction commits.
+    Fixtures (raw saves) carry their auctions with them.
     """
+    if raw:
+        return
+    if update_fields is not None and "approval_status" not in update_fields:
+        return
+    previous, current = instance.approval_change(created)
+    if previous == current:
+        return
     logger.info(
-        f"""Artwork post_save signal
-        triggered for Artwork ID: {instance.id}, Created: {created}"""
+        f"Artwork {instance.id} approval status: {previous} -> {current}"
+    )
+    APPROVAL_TRANSITIONS.labels(previous, current).inc()
+    transaction.on_commit(lambda: instance.sync_auction(previous))
+
+
+@receiver(post_save, sender=Artwork)
+@receiver(post_delete, sender=Artwork)
+def invalidate_artwork_cache(sender, instance, **kwargs):
+    """
+    Signal receiver to drop cached listing fragments
+    for the artwork's category whenever it changes.
+    """
+    if kwargs.get("raw"):
+        return
+    transaction.on_commit(lambda: invalidate_catalogue(instance.category))
+
+
+@receiver(post_save, sender=Auction)
+@receiver(post_delete, sender=Auction)
+@receiver(post_delete, sender=Bids)
+def invalidate_auction_cache(sender, instance, **kwargs):
+    """
+    Signal receiver to drop cached listing fragments
+    for the category of the artwork being auctioned,
+    and the auction's cached state,
+    whenever an auction changes or one of its bids is deleted.
+    New bids are handled by place_bid, which already
+    knows the category.
+    """
+    if kwargs.get("raw"):
+        return
+    auction_id = instance.pk if sender is Auction else instance.auction_id
+    categories = list(
+        Artwork.objects.filter(auctions__id=auction_id).values_list(
+            "category", flat=True
+        )
     )
-    if instance.approval_status == "approved":
-        instance.approve_and_start_auction()
+    transaction.on_commit(lambda: invalidate_catalogue(*categories))
+    transaction.on_commit(lambda: invalidate_auction_state(auction_id))
 
 
 @receiver(user_signed_up)
 def user_signed_up_(request, user, **kwargs):
     """
-    Signal receiver to send a
+    Signal receiver to queue a
     welcome email to the user upon successful sign-up.
     """
-    send_mail(
+    enqueue_email(
         "Welcome to Uptown Gallery",
         "Thank I for signing up for our site!",
         "mailto@uptowngallery.com",
         [user.email],
-        fail_silently=False,
+        dedup_key=f"welcome:{user.pk}",
     )
 
 
-@receiver(artwork_approved)
-def send_artwork_approval_notification(
-    sender, artwork, request, **kwargs
-):
+@receiver(artworks_approved)
+def send_artwork_approval_notifications(sender, artworks, **kwargs):
     """
-    Signal receiver to send
-    an email notification when an artwork is approved.
-    Notifies the artist that
+    Signal receiver to queue
+    email notifications when artworks are approved,
+    with a single INSERT for the whole batch.
+    Notifies each artist that
     their artwork has been approved and the auction has started.
     """
-    send_mail(
-        "Your Artwork Has Been Approved!",
-        'Your artwork "{}" has been approved and your auction has started.'.
-        format(
-            artwork.title
-        ),
-        "mailto@uptowngallery.com",
-        [artwork.artist.user.email],
-        fail_silently=False,
+    enqueue_emails(
+        OutboundEmail(
+            subject="Your Artwork Has Been Approved!",
+            body='Your artwork "{}" has been approved and your auction has started.'
+            .format(artwork.title),
+            from_email="mailto@uptowngallery.com",
+            recipients=[artwork.artist.user.email],
+        )
+        for artwork in artworks
+        if artwork.artist and artwork.artist.user.email
     )
 
 
-@receiver(artwork_denied)
-def send_artwork_denial_notification(
-    sender, artwork, request, **kwargs
-):
+@receiver(artworks_denied)
+def send_artwork_denial_notifications(sender, artworks, **kwargs):
     """
-    Signal receiver to send an
-    email notification when an artwork is denied.
-    Notifies the artist that their
+    Signal receiver to queue
+    email notifications when artworks are denied,
+    with a single INSERT for the whole batch.
+    Notifies each artist that their
     artwork has been denied and will be deleted.
     """
-    send_mail(
-        "Your Artwork Has Been Denied",
-        'Your artwork"{}"has been denied and will be deleted.'
-        .format(
-            artwork.title
-        ),
-        "mailto@uptowngallery.com",
-        [artwork.artist.user.email],
-        fail_silently=False,
+    enqueue_emails(
+        OutboundEmail(
+            subject="Your Artwork Has Been Denied",
+            body='Your artwork"{}"has been denied and will be deleted.'
+            .format(artwork.title),
+            from_email="mailto@uptowngallery.com",
+            recipients=[artwork.artist.user.email],
+        )
+        for artwork in artworks
+        if artwork.artist and artwork.artist.user.email
     )
 
 
-@receiver(auction_closed)
-def auction_closed_email_notification(sender, auction, **kwargs):
+@receiver(auctions_closed)
+def send_auction_closed_notifications(sender, auctions, **kwargs):
     """
-    Signal receiver to send
-    an email notification when an auction is closed.
-    Notifies the artist
-    of the auction's closure.
+    Signal receiver to queue
+    email notifications when a batch of auctions is closed,
+    with a single INSERT for the whole batch.
+    Notifies each artist
+    of their auction's closure.
     """
-    artist_user_email = auction.artwork.artist.user.email
-    subject = f"Auction for {auction.artwork.title} has ended"
-    message = (
-        f"Dear {auction.artwork.artist.name},\n\n"
-        f"The auction for the artwork '{auction.artwork.title}' has ended."
-    )
-    from_email = "mailto@uptownfgallery.com"
-    recipient_list = [artist_user_email]
-    send_mail(
-        subject,
-        message,
-        from_email,
-        recipient_list,
-        fail_silently=False,
+    enqueue_emails(
+        OutboundEmail(
+            subject=f"Auction for {auction.artwork.title} has ended",
+            body=(
+                f"Dear {auction.artwork.artist.name},\n\n"
+                f"The auction for the artwork '{auction.artwork.title}'"
+                " has ended."
+            ),
+            from_email="mailto@uptownfgallery.com",
+            recipients=[auction.artwork.artist.user.email],
+            dedup_key=f"auction-closed:{auction.pk}",
+        )
+        for auction in auctions
+        if auction.artwork
+        and auction.artwork.artist
+        and auction.artwork.artist.user.email
     )
 
 
@@ -155,63 +216,171 @@ def auction_closed_email_notification(sender, auction, **kwargs):
 def send_notification_emails(sender, bid, user, **kwargs):
     """
     Signal receiver to
-    send email notifications upon placing a bid.
+    queue email notifications upon placing a bid.
     Notifies both the bidder
     and the artwork's artist about the new bid.
     """
-    send_mail(
+    enqueue_email(
         subject="Bid Confirmation",
         message=f"""Your bid of {bid.amount} has been
-        placed successfully on {bid.auction.artwork.title}.",
-        from_email="mailto@uptownfgallery.com""",
+        placed successfully on {bid.auction.artwork.title}.""",
+        from_email="mailto@uptownfgallery.com",
         recipient_list=[user.email],
-        fail_silently=False,
+        dedup_key=f"bid-confirmation:{bid.pk}",
     )
     artist = bid.auction.artwork.artist
     if artist and hasattr(artist, "email") and artist.email:
-        send_mail(
+        enqueue_email(
             subject="New Bid Placed on Your Artwork",
             message=f"""A new bid of {bid.amount}has been placed
             on your artwork '{bid.auction.artwork.title}'
             by user {user.username}.""",
             from_email="mailto@uptownfgallery.com",
             recipient_list=[artist.email],
-            fail_silently=False,
+            dedup_key=f"new-bid:{bid.pk}",
+        )
+
+
+@receiver(bid_placed)
+def publish_bid_event(sender, bid, user, **kwargs):
+    """
+    Signal receiver to push the new price and bid count
+    to everyone watching the auction live.
+    """
+    state = (
+        Auction.objects.filter(pk=bid.auction_id)
+        .values("current_price", "bid_count")
+        .first()
+    )
+    if state is None:
+        return
+    publish_event(
+        bid.auction_id,
+        "bid",
+        amount=str(bid.amount),
+        current_price=str(state["current_price"]),
+        bid_count=state["bid_count"],
+        bid_time=bid.bid_time.isoformat(),
+    )
+
+
+@receiver(auctions_closed)
+def publish_closed_events(sender, auctions, **kwargs):
+    """
+    Signal receiver to tell live watchers their auction has closed.
+    From the closer process, this only reaches web processes through
+    a shared broker; streams also check for it between events.
+    """
+    for auction in auctions:
+        winning_bid = auction.winning_bid
+        publish_event(
+            auction.pk,
+            "closed",
+            winning_amount=str(winning_bid.amount) if winning_bid else None,
         )
 
 
 @receiver(profile_updated)
 def send_profile_update_email(sender, user, field, new_value, **kwargs):
     """
-    Signal receiver to send
+    Signal receiver to queue
     email notifications when
     a user's profile is updated.
     Handles specific fields
     like 'shipping_address'.
     """
     if field == "shipping_address":
-        send_mail(
+        enqueue_email(
             subject="Shipping Address Updated",
             message=f"Your shipping address has been updated to: {new_value}.",
             from_email="mailto@uptownfgallery.com",
             recipient_list=[user.email],
-            fail_silently=False,
         )
 
 
 @receiver(profile_updated)
 def send_profile_update_email(sender, user, field, new_value, **kwargs):
     """
-    Signal receiver to send
+    Signal receiver to queue
     email notifications when
     a user's profile is updated.
     Handles specific fields like 'name'.
     """
     if field == "name":
-        send_mail(
+        enqueue_email(
             subject="Name Updated",
             message=f"Your name has been updated to: {new_value}.",
             from_email="mailto@uptownfgallery.com",
             recipient_list=[user.email],
-            fail_silently=False,
-        )
\ No newline at end of file
+        )
+
+
+@receiver(post_save, sender=Artwork)
+def index_artwork(sender, instance, raw=False, **kwargs):
+    """
+    Signal receiver to refresh the artwork's
+    search document whenever it is saved.
+    After loading a fixture, run rebuild_search_index instead.
+    """
+    if raw:
+        return
+    index_artworks([instance.pk])
+
+
+@receiver(post_delete, sender=Artwork)
+def unindex_artwork(sender, instance, **kwargs):
+    """
+    Signal receiver to drop a deleted artwork
+    from the search index.
+    """
+    remove_artworks([instance.pk])
+
+
+@receiver(post_save, sender=UserProfile)
+def reindex_artist_artworks(sender, instance, created, raw=False, **kwargs):
+    """
+    Signal receiver to refresh the search documents
+    of an artist's artworks, which include the artist's name,
+    when their profile changes.
+    """
+    if not created and not raw:
+        index_artworks(instance.artwork_set.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=Artwork)
+def refresh_artwork_catalog_entry(sender, instance, raw=False, **kwargs):
+    """
+    Signal receiver to rewrite the catalogue row of an approved
+    artwork (title, category, image) whenever it is saved.
+    Approval changes reach the catalogue through the auction
+    they start or cancel.
+    After loading a fixture, run rebuild_catalog instead.
+    """
+    if raw or instance.approval_status != "approved":
+        return
+    refresh_catalog([instance.pk])
+
+
+@receiver(post_save, sender=Auction)
+@receiver(post_delete, sender=Auction)
+def refresh_auction_catalog_entry(sender, instance, raw=False, **kwargs):
+    """
+    Signal receiver to add, move or drop the catalogue row
+    of the auctioned artwork when one of its auctions
+    starts, ends or is deleted.
+    """
+    if raw or instance.artwork_id is None:
+        return
+    refresh_catalog([instance.artwork_id])
+
+
+@receiver(post_save, sender=UserProfile)
+def rename_artist_catalog_entries(
+    sender, instance, created, raw=False, **kwargs
+):
+    """
+    Signal receiver to show an artist's new name
+    on their catalogue rows.
+    """
+    if not created and not raw:
+        update_artist_name(instance)
@@ -0,0 +1,48 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
+from uptowngallery.renditions import FALLBACK_FORMAT, rendition_set
+
+register = template.Library()
+
+
+@register.simple_tag
+def picture(artwork, name, loading="lazy", **attrs):
+    """
+    Render an artwork's image as a responsive <picture>:
+    a <source> per modern format and an <img> fallback, each
+    with a srcset of the named rendition (see renditions.RENDITIONS).
+    Extra keyword arguments become <img> attributes, with
+    underscores turned into dashes (aria_label="...").
+    Renders nothing if the artwork has no image yet.
+
+        {% load renditions %}
+        {% picture artwork "card" class="card-img-top" %}
+    """
+    renditions = rendition_set(artwork, name)
+    if renditions is None:
+        return ""
+    sources = format_html_join(
+        "",
+        '<source type="image/{}" srcset="{}" sizes="{}">',
+        (
+            (image_format, srcset, renditions["sizes"])
+            for image_format, srcset in renditions["srcset"].items()
+            if image_format != FALLBACK_FORMAT
+        ),
+    )
+    img_attrs = {
+        "src": renditions["src"],
+        "srcset": renditions["srcset"].get(FALLBACK_FORMAT),
+        "sizes": renditions["sizes"],
+        "width": renditions["width"],
+        "height": renditions["height"],
+        "alt": artwork.title,
+        "loading": loading,
+        "decoding": "async",
+    }
+    img_attrs.update(
+        (key.replace("_", "-"), value) for key, value in attrs.items()
+    )
+    img_attrs = {k: v for k, v in img_attrs.items() if v is not None}
+    return format_html("<picture>{}<img{}></picture>", sources, flatatt(img_attrs))
@@ -12,6 +12,10 @@ from .views import (
     AboutView,
     SearchActiveAuctionArtworkView,
     EditArtworkView,
+    auction_events_view,
+    auction_state_view,
+    cache_stats_view,
+    metrics_view,
 )
 
 urlpatterns = [
@@ -47,4 +51,16 @@ urlpatterns = [
         SearchActiveAuctionArtworkView.as_view(),
         name="search_artworks",
     ),
+    path(
+        "api/auctions/<int:auction_id>/state",
+        auction_state_view,
+        name="auction_state",
+    ),
+    path(
+        "auctions/<int:auction_id>/events/",
+        auction_events_view,
+        name="auction_events",
+    ),
+    path("cache-stats/", cache_stats_view, name="cache_stats"),
+    path("metrics", metrics_view, name="metrics"),
 ]
\ No newline at end of file
@@ -1,10 +1,27 @@
-from django.db.models import Q, Max, Prefetch
-from django.http import JsonResponse
+import asyncio
+import time
+from asgiref.sync import sync_to_async
+from django.db.models import DecimalField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.conf import settings
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseForbidden,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
 from django.urls import reverse_lazy,reverse
-from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import constant_time_compare
+from django.utils.http import urlencode
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.utils.decorators import method_decorator
+from django.utils.functional import SimpleLazyObject
 from django.views import View
+from django.views.decorators.http import require_GET
 from django.views.generic import TemplateView
 from django.views.generic.edit import CreateView
 from django.contrib import messages
@@ -17,9 +34,61 @@ from .forms import (
     BidForm,
     ArtworkEditForm,
 )
-from .models import Artwork, Auction, Bids
+from .models import Artwork, Auction, Bids, CatalogEntry
+from .bidding import place_bid
+from .deletion import delete_artworks, delete_auctions
+from .auctions import auction_state
+from .catalog import CATALOG_ORDERING
+from .conditional import (
+    auction_last_modified,
+    catalogue_last_modified,
+    conditional_page,
+)
+from .cache import (
+    AUCTION_STATE_TIMEOUT,
+    cache_stats,
+    cached_fragment,
+    cached_value,
+)
+from .events import format_event, get_broker
+from .metrics import (
+    BID_SECONDS,
+    BIDS_ACCEPTED,
+    BIDS_INVALID,
+    BIDS_REJECTED,
+    CONTENT_TYPE,
+    REGISTRY,
+)
+from .pagination import DEFAULT_ORDERING, KeysetPaginator
+from .search import search_artworks
 from django.http import HttpResponseNotFound, HttpResponseServerError
 
+def paginate(request, queryset, per_page, ordering=DEFAULT_ORDERING):
+    """
+    Paginate a queryset in the given ordering
+    (newest first by default).
+    Numbered pages are used when the request asks for ?page=
+    so existing links keep working; otherwise the page is
+    fetched by cursor (?cursor=), which costs the same at any depth.
+    """
+    if "page" in request.GET:
+        return Paginator(queryset.order_by(*ordering), per_page).get_page(
+            request.GET.get("page")
+        )
+    return KeysetPaginator(
+        queryset, per_page, approximate_totals=True, ordering=ordering
+    ).get_page(request.GET.get("cursor"))
+
+
+def query_prefix(**params):
+    """
+    Build the query string prefix that pagination links append
+    their page or cursor parameter to.
+    """
+    params = {key: value for key, value in params.items() if value}
+    return urlencode(params) + "&" if params else ""
+
+
 class CustomLoginRequiredMixin(AccessMixin):
     """Require login only for POST requests."""
     def dispatch(self, request, *args, **kwargs):
@@ -28,13 +97,23 @@ class CustomLoginRequiredMixin(AccessMixin):
         return super().dispatch(request, *args, **kwargs)
 class LandingPageView(View):
     """
-    Retrieve 10 most recent artowrks to display
+    Retrieve 10 most recent artowrks in active auctions
+    from the catalogue to display,
+    served from the cache until the catalogue changes
+    Unchanged pages are answered with 304 Not Modified
     """
 
+    @method_decorator(
+        conditional_page(catalogue_last_modified, versioned=True)
+    )
     def get(self, request):
-        recent_artworks = Artwork.objects.filter(
-            approved=True
-        ).order_by("-create_date")[:10]
+        recent_artworks = cached_value(
+            "recent_artworks",
+            [10],
+            lambda: list(
+                CatalogEntry.objects.order_by(*CATALOG_ORDERING)[:10]
+            ),
+        )
         return render(
             request,
             "index.html",
@@ -47,53 +126,59 @@ class LandingPageView(View):
 class ArtworkListView(View):
     """
     Gets the category from the request
-    Filters by category
-    Annotate each artwork with the
-    ID of its most recent active auction
-    Prefetch the related recent active auction for each artwork
-    Implement Pagination,show 10 artworks per page
+    Filters the catalogue (one row per artwork in an active
+    auction, with its most recent auction ID) by category
+    Implement Pagination,show 12 artworks per page
+    The rendered card grid is cached per (category, page);
+    the page is only queried on a cache miss
+    Unchanged pages are answered with 304 Not Modified
     Pass the category to the template
     """
 
+    @method_decorator(
+        conditional_page(catalogue_last_modified, versioned=True)
+    )
     def get(self, request):
         category = request.GET.get("category")
-        artworks = Artwork.objects.filter(
-            approval_status="approved", auctions__status="active"
-        ).distinct()
-        artworks = artworks.order_by("-create_date")
-        if category:
-            artworks = artworks.filter(category=category)
-        artworks = artworks.annotate(
-            recent_auction_id=Max(
-                "auctions__id", filter=Q(auctions__status="active")
+        page_obj = SimpleLazyObject(
+            lambda: paginate(
+                request,
+                self.get_queryset(category),
+                12,
+                ordering=CATALOG_ORDERING,
             )
         )
-        artworks = artworks.prefetch_related(
-            Prefetch(
-                "auctions",
-                queryset=Auction.objects.filter(
-                    id__in=[
-                        artwork.recent_auction_id
-                        for artwork in artworks
-                    ],
-                    status="active",
-                ),
-                to_attr="recent_auction",
-            )
+        base_query = query_prefix(category=category)
+        grid = cached_fragment(
+            "artwork_grid",
+            [request.GET.get("page"), request.GET.get("cursor")],
+            lambda: render_to_string(
+                "artwork_grid.html",
+                {
+                    "page_obj": page_obj,
+                    "category": category,
+                    "base_query": base_query,
+                },
+                request=request,
+            ),
+            category=category,
         )
-        paginator = Paginator(artworks, 12)
-        page_number = request.GET.get("page")
-        page_obj = paginator.get_page(page_number)
-
         return render(
             request,
             "artwork_list.html",
             {
+                "grid": grid,
                 "page_obj": page_obj,
                 "category": category,
             },
         )
 
+    def get_queryset(self, category):
+        entries = CatalogEntry.objects.all()
+        if category:
+            entries = entries.filter(category=category)
+        return entries
+
 
 class CreateArtworkView(LoginRequiredMixin, CreateView):
     """
@@ -139,7 +224,7 @@ class PendingArtworksView(LoginRequiredMixin, View):
     """
     Filter artworks to show
     only pending artworks of the current user
-    Paginate the artworks,
+    Paginate the artworks by cursor (or by ?page= number),
     show 10 artworks per page
     """
 
@@ -148,6 +233,19 @@ class PendingArtworksView(LoginRequiredMixin, View):
             artworks = Artwork.objects.filter(approved=False) 
         else:
             artworks = Artwork.objects.filter(artist=request.user.profile, approved=False)
+        artworks = artworks.select_related("artist").order_by(
+            "-create_date", "-id"
+        )
+
+        if "page" not in request.GET:
+            artworks = KeysetPaginator(artworks, 10).get_page(
+                request.GET.get("cursor")
+            )
+            return render(
+                request,
+                "pending_artworks.html",
+                {"artworks": artworks, "page_obj": artworks},
+            )
 
         paginator = Paginator(artworks, 10)
         page = request.GET.get("page")
@@ -158,7 +256,11 @@ class PendingArtworksView(LoginRequiredMixin, View):
         except EmptyPage:
             artworks = paginator.page(paginator.num_pages)
         
-        return render(request, "pending_artworks.html", {"artworks": artworks})
+        return render(
+            request,
+            "pending_artworks.html",
+            {"artworks": artworks, "page_obj": artworks},
+        )
 
     def post(self, request, *args, **kwargs):
         action = request.POST.get("action")
@@ -167,12 +269,7 @@ class PendingArtworksView(LoginRequiredMixin, View):
             Artwork, id=artwork_id, artist=request.user.profile
         )
         if action == "delete":
-            referencing_auctions = Auction.objects.filter(
-                artwork=artwork
-            )
-        if referencing_auctions.exists():
-            referencing_auctions.delete()
-            artwork.delete()
+            delete_artworks([artwork.pk])
             messages.success(request, "Artwork deleted successfully.")
             return redirect("pending_artworks")
         elif action == "update":
@@ -207,33 +304,33 @@ def signup_view(request):
 
 class AuctionDetailView(CustomLoginRequiredMixin, View):
     """
-    Fetch artwork and auction or return 404 if not found
-    Get all bids for the auction,
-    calculate current highest bid or use reserve price
+    Fetch the auction with its artwork and artist
+    or return 404 if not found
+    Read the current price kept on the auction,
+    falling back to the reserve price
     Prepare context and render
     appropriate template based on request type (AJAX or regular)
     Fetch artwork and auction for bid processing
     Process bid form
-    Save bid data, send signal, and redirect on successful bid
+    Place the bid through the locking bid service,
+    and redirect on successful bid
     Add form errors as messages and redisplay form with errors
+    Unchanged pages are answered with 304 Not Modified
     """
 
+    @method_decorator(conditional_page(auction_last_modified))
     def get(self, request, artwork_id, auction_id):
-        artwork = get_object_or_404(Artwork, pk=artwork_id)
         auction = get_object_or_404(
-            Auction, pk=auction_id, artwork=artwork
-        )
-        bids = Bids.objects.filter(auction=auction).order_by("-amount")
-        current_price = (
-            bids.first().amount
-            if bids.exists()
-            else auction.reserve_price
+            Auction.objects.select_related("artwork__artist"),
+            pk=auction_id,
+            artwork_id=artwork_id,
         )
+        artwork = auction.artwork
         form = BidForm()
         context = {
             "auction": auction,
             "artwork": artwork,
-            "current_price": current_price,
+            "current_price": auction.price,
             "form": form,
         }
         if request.headers.get("X-Requested-With") == "XMLHttpRequest":
@@ -250,19 +347,28 @@ class AuctionDetailView(CustomLoginRequiredMixin, View):
         auction = get_object_or_404(Auction, pk=auction_id, artwork=artwork)
 
         if request.user.profile == artwork.artist:
+            BIDS_INVALID.inc()
             messages.error(request, "You cannot bid on your own artwork.")
             return self.get(request, artwork_id, auction_id)
 
         form = BidForm(request.POST, auction=auction)
         if form.is_valid():
-            bid = form.save(commit=False)
-            bid.bidder = request.user.profile
-            bid.auction = auction
-            bid.bid_time = timezone.now()
-            bid.save()
+            with BID_SECONDS.time():
+                result = place_bid(
+                    auction.pk,
+                    request.user.profile,
+                    form.cleaned_data["amount"],
+                    user=request.user,
+                )
+            if not result.accepted:
+                BIDS_REJECTED.inc()
+                messages.error(request, result.error)
+                return self.get(request, artwork_id, auction_id)
+            BIDS_ACCEPTED.inc()
             messages.success(request, "Your bid was submitted successfully!")
             return redirect("auction_detail", artwork_id=artwork_id, auction_id=auction_id)
         else:
+            BIDS_INVALID.inc()
             for error in form.errors.values():
                 messages.error(request, error)
             return self.get(request, artwork_id, auction_id)
@@ -331,8 +437,11 @@ class ActivityDashboardView(LoginRequiredMixin, View):
     Fetch bidding activity
     Fetch selling activity
     Fetch active auctions
-    Fetch closed auctions and enhance with final price
+    Fetch closed auctions annotated with their final price
     Consolidate all context data
+    Every section is a single query, so the page costs
+    the same number of queries however much activity
+    the user has.
     """
 
     def get(self, request):
@@ -344,25 +453,35 @@ class ActivityDashboardView(LoginRequiredMixin, View):
         user_profile = request.user.profile
         bidding_activity = Bids.objects.filter(
             bidder=user_profile
-        ).select_related("auction")
-        selling_activity = Artwork.objects.filter(artist=user_profile)
+        ).select_related("auction__artwork")
+        selling_activity = Artwork.objects.filter(
+            artist=user_profile
+        ).annotate(
+            first_auction_id=Subquery(
+                Auction.objects.filter(artwork=OuterRef("pk"))
+                .order_by("id")
+                .values("id")[:1]
+            )
+        )
         active_auctions = Auction.objects.filter(
             artwork__artist=user_profile,
             status="active",
             artwork__approval_status="approved",
-        )
-        closed_auctions = Auction.objects.filter(
-            artwork__artist=user_profile, status="closed"
         ).select_related("artwork")
-        for auction in closed_auctions:
-            final_bid = (
-                Bids.objects.filter(auction=auction)
-                .order_by("-amount")
-                .first()
+        closed_auctions = (
+            Auction.objects.filter(
+                artwork__artist=user_profile, status="closed"
             )
-            auction.final_price = (
-                final_bid.amount if final_bid else auction.reserve_price
+            .select_related("artwork")
+            .annotate(
+                final_price=Coalesce(
+                    "winning_bid__amount",
+                    "current_price",
+                    "reserve_price",
+                    output_field=DecimalField(max_digits=10, decimal_places=2),
+                )
             )
+        )
         context = {
             "bidding_activity": bidding_activity,
             "selling_activity": selling_activity,
@@ -389,7 +508,7 @@ class ActivityDashboardView(LoginRequiredMixin, View):
             )
 
             if auction.status == "closed":
-                auction.delete()
+                delete_auctions([auction.pk])
                 messages.success(
                     request, "Auction deleted successfully."
                 )
@@ -403,6 +522,148 @@ class ActivityDashboardView(LoginRequiredMixin, View):
         return redirect("activity")
 
 
+@require_GET
+def auction_state_view(request, auction_id):
+    """
+    Return an auction's current price, bid count, end date
+    and artwork summary as JSON for the listing modal.
+    The state's version is sent as the ETag, so a client
+    that already has it gets an empty 304 response.
+    """
+    state = auction_state(auction_id)
+    if state is None:
+        raise Http404("Auction not found.")
+    etag = f'"{state["version"]}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse(state)
+    response["ETag"] = etag
+    patch_cache_control(response, max_age=AUCTION_STATE_TIMEOUT)
+    return response
+
+
+async def auction_events_view(request, auction_id):
+    """
+    Stream an auction's bid events to the browser as
+    Server-Sent Events: the current state first, then
+    one event per bid until the auction closes.
+    Every watcher shares the broker's single fan-out per bid,
+    so they need no polling or page renders.
+    Auctions that are not active answer 204, which tells
+    EventSource not to reconnect.
+    Must be served over ASGI.
+    """
+    state = await (
+        Auction.objects.filter(pk=auction_id)
+        .values("id", "status", "current_price", "reserve_price", "bid_count")
+        .afirst()
+    )
+    if state is None:
+        raise Http404("Auction not found.")
+    if state["status"] != "active":
+        return HttpResponse(status=204)
+    subscription = get_broker().subscribe(auction_id)
+    price = state["current_price"] or state["reserve_price"]
+
+    async def stream():
+        deadline = time.monotonic() + settings.EVENT_STREAM_MAX_SECONDS
+        try:
+            yield format_event(
+                {
+                    "type": "state",
+                    "auction_id": auction_id,
+                    "status": state["status"],
+                    "current_price": str(price),
+                    "bid_count": state["bid_count"],
+                }
+            )
+            while time.monotonic() < deadline:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.get(), settings.EVENT_STREAM_HEARTBEAT
+                    )
+                except asyncio.TimeoutError:
+                    # The closer runs in its own process, whose closed
+                    # events only reach this one through a shared
+                    # broker: look at the auction itself between events.
+                    closed = await _closed_event(auction_id)
+                    if closed:
+                        yield format_event(closed)
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_event(event)
+                if event["type"] == "closed":
+                    return
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(
+        stream(), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def _closed_event(auction_id):
+    """
+    The closed event of an auction that is no longer active,
+    or None while it is. Reads the briefly cached auction state,
+    so watchers of one auction share a query.
+    """
+    state = await sync_to_async(auction_state)(auction_id)
+    if state is not None and state["status"] == "active":
+        return None
+    winning_amount = await (
+        Auction.objects.filter(pk=auction_id)
+        .values_list("winning_bid__amount", flat=True)
+        .afirst()
+    )
+    return {
+        "type": "closed",
+        "auction_id": auction_id,
+        "winning_amount": (
+            str(winning_amount) if winning_amount is not None else None
+        ),
+    }
+
+
+def _monitoring_allowed(request):
+    """
+    Whether a request may read the monitoring endpoints: it must send
+    METRICS_TOKEN as a bearer token. Without a token they are only
+    open when DEBUG is on.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        return settings.DEBUG
+    return constant_time_compare(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    )
+
+
+def cache_stats_view(request):
+    """
+    Hit and miss counters of the page fragment cache, as JSON.
+    Protected like metrics_view.
+    """
+    if not _monitoring_allowed(request):
+        return HttpResponseForbidden()
+    return JsonResponse(cache_stats())
+
+
+def metrics_view(request):
+    """
+    Auction, bidding and email metrics in the Prometheus text format.
+    Scrapers must send METRICS_TOKEN as a bearer token;
+    with no token configured the endpoint answers 403 unless DEBUG is on.
+    """
+    if not _monitoring_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(REGISTRY.exposition(), content_type=CONTENT_TYPE)
+
+
 class AboutView(TemplateView):
     template_name = "about.html"
 
@@ -416,16 +677,20 @@ class SearchActiveAuctionArtworkView(View):
     in active auctions.
     It accepts a search query and
     returns artworks that match the
-    query criteria (title, approval status,
+    query criteria (full-text match on title, artist,
+    category and description, approval status,
     and active auction status).
     """
 
+    ordering = ("rank", *CATALOG_ORDERING)
+
     def get(self, request):
         """
         Processes GET requests to perform
         a search based on a query string.
-        It filters artworks by title,
-        ensuring they are approved and part of active auctions.
+        It matches catalogue entries through the search backend,
+        so only approved artworks in active auctions are found,
+        with title matches ranked above artist and description ones.
         The view supports pagination and shows the results
         on an artwork list page.
         """
@@ -436,42 +701,13 @@ class SearchActiveAuctionArtworkView(View):
             "query": query,
         }
         if query:
-            artworks = (
-                Artwork.objects.filter(
-                    title__icontains=query,
-                    approval_status="approved",
-                    auctions__status="active",
-                )
-                .distinct()
-                .order_by("-create_date")
-            )
-            artworks = artworks.annotate(
-                recent_auction_id=Max(
-                    "auctions__id", filter=Q(auctions__status="active")
-                )
-            )
-            recent_auction_ids = list(
-                filter(
-                    None,
-                    artworks.values_list(
-                        "recent_auction_id", flat=True
-                    ),
-                )
+            entries = search_artworks(
+                CatalogEntry.objects.all(), query, prefix="artwork__"
             )
-            artworks = artworks.prefetch_related(
-                Prefetch(
-                    "auctions",
-                    queryset=Auction.objects.filter(
-                        id__in=recent_auction_ids,
-                        status="active",
-                    ),
-                    to_attr="recent_auction",
-                )
+            context["page_obj"] = paginate(
+                request, entries, 10, ordering=self.ordering
             )
-            paginator = Paginator(artworks, 10)
-            page_number = request.GET.get("page")
-            page_obj = paginator.get_page(page_number)
-            context["page_obj"] = page_obj
+            context["base_query"] = query_prefix(query=query)
         else:
             context["error"] = "Please enter a search term."
         return render(request, "artwork_list.html", context)